@@ -0,0 +1,38 @@
+"""
+Cost of importing a shared library and calling one of its functions, when
+c_import() reuses the handle that is already loaded for the library, and
+when the library is loaded again each time with ctypes.CDLL, as CModule
+used to do.
+
+PYTHONPATH=. python benchmarks/bench_c_import.py
+"""
+import ctypes
+import ctypes.util
+import sys
+import timeit
+
+from multi_tools.c import c_import
+
+
+LIBM = "msvcrt" if sys.platform == "win32" else ctypes.util.find_library("m")
+NUMBER = 20000
+
+
+def load_once_then_call():
+    return c_import(LIBM).labs(-3)
+
+
+def load_each_time_then_call():
+    return ctypes.CDLL(LIBM).labs(-3)
+
+
+def main():
+    for name, case in (("c_import (load once)", load_once_then_call),
+                       ("ctypes.CDLL each time", load_each_time_then_call)):
+        assert case() == 3
+        seconds = min(timeit.repeat(case, number=NUMBER, repeat=5))
+        print(f"{name:<24} {seconds / NUMBER * 1e6:8.2f} us per import + call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Allocations and memory of CInt values: the number of memory blocks that
+are still allocated per CInt(5) once it's created, the bytes they use per
+million instances, and the time to create one. For comparison, the last
+case builds a new ctypes type for every value, as CObject.__init__ used to.
+
+PYTHONPATH=. python benchmarks/bench_cobject.py
+"""
+import timeit
+import tracemalloc
+
+from multi_tools.c import types
+from multi_tools.c._c_types._base_types import _SimpleCDataWrapper
+
+
+COUNT = 1000000
+
+
+def type_per_value():
+    return _SimpleCDataWrapper(types.CInt.__tpid__)(5)
+
+
+def measure(name, create, count):
+    create()  # builds what is built once per class.
+    values = [None] * count  # the list itself isn't measured.
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(count):
+        values[i] = create()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats) / count
+    size = sum(stat.size_diff for stat in stats) / count
+    del values
+
+    seconds = min(timeit.repeat(create, number=10000, repeat=5))
+    print(f"{name:<22} {blocks:8.2f} blocks {size:10.0f} bytes "
+          f"({size * 1000000 / 2 ** 20:7.1f} MiB per million) {10000 / seconds:12,.0f} per second")
+
+
+def main():
+    measure("CInt(5)", lambda: types.CInt(5), COUNT)
+    measure("new type per value", type_per_value, COUNT // 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Attribute access throughput of system handles: functions of a Dll handle,
+and attributes of a Module handle, both forwarded to the handled object.
+
+PYTHONPATH=. python benchmarks/bench_handle.py
+"""
+import sys
+import timeit
+
+from multi_tools.system import DLL
+from multi_tools.system.env import Module
+
+
+LIBM = "msvcrt" if sys.platform == "win32" else "m"
+NUMBER = 200000
+
+
+def main():
+    dll = DLL(LIBM)
+    module = Module("json")
+    cases = {
+        "Dll handle: dll.cos": lambda: dll.cos,
+        "Module handle: module.__name__": lambda: module.__name__,
+    }
+    for name, case in cases.items():
+        case()
+        seconds = min(timeit.repeat(case, number=NUMBER, repeat=5))
+        print(f"{name:<32} {NUMBER / seconds:14,.0f} accesses/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Cold import time of multi_tools: each case runs in a fresh interpreter, and
+the median time of its statement is reported (interpreter startup excluded).
+The last case imports what 'import multi_tools' used to import eagerly
+(console excepted, it only loads on Windows).
+
+PYTHONPATH=. python benchmarks/bench_import.py
+"""
+import statistics
+import subprocess
+import sys
+
+
+CASES = [
+    "import multi_tools",
+    "import multi_tools; multi_tools.openfile",
+    "import multi_tools; multi_tools.file_io; multi_tools.stdio; multi_tools.data; multi_tools.arrays",
+]
+RUNS = 15
+
+
+def measure(statement: str) -> float:
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    times = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        times.append(float(output))
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    width = max(map(len, CASES))
+    for statement in CASES:
+        print(f"{statement:<{width}} {measure(statement) * 1000:8.2f} ms")
@@ -0,0 +1,58 @@
+"""
+Calls per second of foreign functions, with arguments and results converted
+by the per-call isinstance ladder (Dll.basic_type_wrap/basic_type_unwrap,
+which unannotated calls still use), by a Marshaller compiled once from the
+annotations, and through DllImport. Plain ctypes calls are the floor.
+
+PYTHONPATH=. python benchmarks/bench_marshalling.py
+"""
+import ctypes
+import ctypes.util
+import sys
+import timeit
+
+from multi_tools import common
+from multi_tools.system import DllImport
+
+
+LIBM = "msvcrt" if sys.platform == "win32" else ctypes.util.find_library("m")
+NUMBER = 200000
+
+
+def pow_hint(x: float, y: float) -> float: ...
+
+
+def main():
+    c_pow = ctypes.CDLL(LIBM).pow
+    c_pow.argtypes = [ctypes.c_double, ctypes.c_double]
+    c_pow.restype = ctypes.c_double
+    args = (2.0, 10.0)
+
+    wrap_value, unwrap_value = common.Dll.basic_type_wrap, common.Dll.basic_type_unwrap
+
+    def ladder():
+        return unwrap_value(c_pow(*[wrap_value(arg) for arg in args]))
+
+    marshaller = common.Dll.compile_marshaller(pow_hint)
+    wrap, unwrap = marshaller.wrap, marshaller.unwrap
+
+    def compiled():
+        return unwrap(c_pow(*wrap(args)))
+
+    @DllImport(LIBM)
+    def pow(x: float, y: float) -> float: ...
+
+    cases = {
+        "plain ctypes": lambda: c_pow(*args),
+        "isinstance ladder": ladder,
+        "compiled marshaller": compiled,
+        "DllImport": lambda: pow(*args),
+    }
+    for name, call in cases.items():
+        assert call() == 1024.0
+        seconds = min(timeit.repeat(call, number=NUMBER, repeat=5))
+        print(f"{name:<20} {NUMBER / seconds:12,.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
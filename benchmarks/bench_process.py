@@ -0,0 +1,80 @@
+"""
+Scaling of CPU-bound python work with the number of worker processes of
+@process (configure_process_pool(n) for n = 1 ... the number of CPUs),
+compared to running it in the calling thread and with @thread, which the
+GIL limits to one core. Also times the round trip of a large bytes
+argument, through shared memory and through pickling.
+
+PYTHONPATH=. python benchmarks/bench_process.py
+"""
+import os
+import time
+
+from multi_tools import config
+from multi_tools.system import runtime
+
+
+TASKS = 16
+WORK = 300_000
+PAYLOAD = 16 * 1024 * 1024
+
+
+def work(n):
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+
+@runtime.process
+def process_work(n):
+    return work(n)
+
+
+@runtime.thread
+def thread_work(n):
+    return work(n)
+
+
+@runtime.process
+def echo(data):
+    return data
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run_all(submit):
+    return [future.result() for future in [submit(WORK) for _ in range(TASKS)]]
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    print(f"{TASKS} tasks of {WORK} iterations, {cpus} CPUs")
+    serial = timed(lambda: [work(WORK) for _ in range(TASKS)])
+    print(f"{'calling thread':<20} {serial:7.3f} s")
+    print(f"{'@thread':<20} {timed(lambda: run_all(thread_work)):7.3f} s")
+
+    counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))) or [1]
+    for count in counts:
+        runtime.configure_process_pool(count)
+        run_all(process_work)  # starts the workers.
+        seconds = timed(lambda: run_all(process_work))
+        print(f"{f'@process, {count} workers':<20} {seconds:7.3f} s   x{serial / seconds:.2f}")
+
+    data = os.urandom(PAYLOAD)
+    threshold = config.Runtime.shared_memory_threshold
+    for name, value in (("shared memory", threshold), ("pickled", PAYLOAD + 1)):
+        config.Runtime.shared_memory_threshold = value
+        echo(data).result()
+        seconds = min(timed(lambda: echo(data).result()) for _ in range(5))
+        print(f"{PAYLOAD >> 20} MB round trip, {name:<14} {seconds * 1e3:7.1f} ms")
+    config.Runtime.shared_memory_threshold = threshold
+    runtime.get_process_pool().shutdown()
+
+
+if __name__ == "__main__":
+    main()
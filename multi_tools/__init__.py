@@ -1,5 +1,8 @@
 import os
 import sys
+import json
+import shutil
+import hashlib
 
 
 """
@@ -14,103 +17,177 @@ bothering with relative paths.
 dlls = ['pointer.dll', 'memory.dll']
 
 
-if sys.platform != "win32":
-    raise NotImplementedError(
-        "multi_tools is not designed to work on other platforms "
-        "than windows, support may be added later on."
-    )
+def _file_hash(path):  # helper function for hashing files without loading them at once.
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
-def _tryopen(file):
-    if os.path.exists(file):
-        return open(file, "rb+")
-    return open(file, "xb+")
+def _file_info(stat_result):
+    return {'size': stat_result.st_size, 'mtime': stat_result.st_mtime_ns}
 
 
-def _copyfile(source, destination):  # helper function for copying files.
-    s = open(source, "rb+")
-    contents = s.read()
-    s.close()
-    print(os.path.exists(destination))
-    if os.path.exists(destination):
-        with _tryopen(destination) as x:
-            getdest = x.read()
+def _read_manifest(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(path, manifest):
+    temp = path + ".tmp"
+    with open(temp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(temp, path)
+
+
+def _sync_file(name, source, destination, manifest):
+    """
+    Bring destination up-to-date with source, using the manifest entry
+    of the file to avoid reading either of them when nothing changed.
+    Return whether the manifest entry has been updated.
+    """
+    entry = manifest.get(name)
+    src_info = _file_info(os.stat(source))
+    try:
+        dest_info = _file_info(os.stat(destination))
+    except FileNotFoundError:
+        dest_info = None
 
-        if getdest != contents:
-            sys.stderr.write("Updating multitools file '{0}'".format(dest))
-            dest_ = open(destination, "wb+")
-            dest_.write(contents)
-            dest_.close()
-    else:
-        with _tryopen(destination) as x:
-            getdest = x.read()
+    if entry is not None and entry['source'] == src_info and entry['destination'] == dest_info:
+        return False  # nothing changed since last sync.
+
+    src_hash = _file_hash(source)
+    if dest_info is None or dest_info['size'] != src_info['size'] or _file_hash(destination) != src_hash:
+        sys.stderr.write("Updating multitools file '{0}'\n".format(destination))
+        shutil.copyfile(source, destination)  # uses the platform's fast copy when possible.
+        dest_info = _file_info(os.stat(destination))
 
-        if getdest != contents:
-            sys.stderr.write("Updating multitools file '{0}'".format(dest))
-            dest_ = open(destination, "rb+")
-            dest_.write(contents)
-            dest_.close()
+    manifest[name] = {'source': src_info, 'destination': dest_info, 'hash': src_hash}
+    return True
 
 
 # constants that depend on the system:
-APPDATA = os.getenv("AppData") + "\\.pyCpp\\"
-DLLPATH = "multi_tools/dlls/"
+if sys.platform == "win32":
+    APPDATA = os.getenv("AppData") + "\\.pyCpp\\"
+else:
+    APPDATA = os.path.expanduser("~/.pyCpp/")
+DLLPATH = os.path.join(os.path.dirname(__file__), "dlls", "")
+MANIFEST = APPDATA + "dlls.manifest"
+
+# "skip" disables dll updates, "defer" delays them until sync_dlls() is called:
+DLL_SYNC_MODE = os.getenv("MULTITOOLS_DLL_SYNC", "")
+
+_dlls_synced = False
+
+
+def sync_dlls():
+    """
+    Update listed dlls to their corresponding version.
+    A manifest storing the size, modification time and hash of each
+    file is kept in APPDATA, so that an up-to-date install only costs
+    a few stat calls.
+    Only has an effect the first time it is called, and only on
+    windows, which the dlls are built for.
+    """
+    global _dlls_synced
+    if _dlls_synced or DLL_SYNC_MODE == "skip" or sys.platform != "win32":
+        return
+    _dlls_synced = True
+
+    # create our own AppData/Roaming/... subfolder if it doesn't already exist:
+    if not os.path.exists(APPDATA):
+        os.mkdir(APPDATA)
 
+    manifest = _read_manifest(MANIFEST)
+    changed = False
+    for dll in dlls:
+        changed |= _sync_file(dll, DLLPATH + dll, APPDATA + dll, manifest)
 
-# create our own AppData/Roaming/... subfolder if it doesn't already exist:
-if not os.path.exists(APPDATA):
-    os.mkdir(APPDATA)
+    if changed:
+        _write_manifest(MANIFEST, manifest)
 
 
-# update listed dlls to their corresponding version:
-for dll in dlls:
-    src = DLLPATH + dll
-    dest = APPDATA + dll
-    if not os.path.exists(APPDATA):
-        os.mkdir(APPDATA)
-    _copyfile(src, dest)
+if DLL_SYNC_MODE not in ("skip", "defer"):
+    sync_dlls()
 
 
 """
 Importing functions from submodules:
-"""
 
-from multi_tools import file_io
-from multi_tools import stdio
-from multi_tools import console
-from multi_tools import data
-from multi_tools import arrays
+Submodules are loaded lazily, the first time one of their names is
+accessed on the package, so that importing multi_tools only to use
+e.g. openfile() doesn't import the whole library.
+Set the MULTITOOLS_EAGER_IMPORT environment variable to import all of
+them immediately instead.
+"""
 
-# path-related functions:
+import importlib
+
+
+# submodules that are exposed by the package:
+_lazy_submodules = ('file_io', 'stdio', 'console', 'data', 'arrays', 'profiling')
+
+# names that are exposed by the package, as (submodule, attribute name) pairs:
+_lazy_attributes = {
+    # path-related functions:
+    'openfile': ('file_io', 'file'),  # for a complete description, see multi_tools.file_io.file()
+    # usage:
+    # file = multi_tools.openfile("folder/example.txt")
+    # file.write("hello")
+    # x = file.read()
+
+    'createfile': ('file_io', 'nfile'),  # for a complete description, see multi_tools.file_io.nfile()
+    # usage:
+    # multi_tools.createnewfile("folder/example2.txt")
+
+    # console-related objects:
+    'stdout': ('stdio', 'stdout'),
+    'stdin': ('stdio', 'stdin'),
+    'stderr': ('stdio', 'stderr'),
+
+    'abstractmethod': ('data', 'AbstractMethod'),
+}
+
+
+def __getattr__(name):
+    """
+    Implement getattr(multi_tools, name) for lazily loaded names.
+    Loaded values are stored in the module's globals, so this
+    is only called once per name.
+    """
+    if name in _lazy_submodules:
+        value = importlib.import_module(f"{__name__}.{name}")
+    elif name in _lazy_attributes:
+        module_name, attr_name = _lazy_attributes[name]
+        value = getattr(__getattr__(module_name), attr_name)
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
-openfile = file_io.file  # for a complete description, see multi_tools.file_io.file()
-# usage:
-# file = multi_tools.openfile("folder/example.txt")
-# file.write("hello")
-# x = file.read()
+    globals()[name] = value
+    return value
 
-createfile = file_io.nfile  # for a complete description, see multi_tools.file_io.nfile()
-# usage:
-# multi_tools.createnewfile("folder/example2.txt")
 
+def __dir__():
+    return sorted({*globals(), *_lazy_submodules, *_lazy_attributes})
 
-# console-related objects:
 
-stdout = stdio.stdout
-stdin = stdio.stdin
-stderr = stdio.stderr
+if os.getenv("MULTITOOLS_EAGER_IMPORT"):
+    for _name in (*_lazy_submodules, *_lazy_attributes):
+        __getattr__(_name)
+    del _name
 
 
-def printf(text: str, end="\n", ostream: console.OStream = None):
+def printf(text: str, end="\n", ostream: "console.OStream" = None):
     if ostream is None:
         sys.stdout.write(text + end)
     else:
         ostream.write(text, end=end)
 
 
-abstractmethod = data.AbstractMethod
-
-
 def format_id(obj):
     hex_ = hex(id(obj))
     return str(hex_).upper()
@@ -1,4 +1,5 @@
-from . import c_module
+from . import c_module, records, callbacks, headers
+from .. import common
 from os import PathLike
 
 
@@ -7,6 +8,38 @@ class modes:
     STDCALL = c_module.STDCALL
 
 
-def c_import(path: PathLike, mode: int = modes.CDECL) -> c_module.CModule:
-    return c_module.c_import(path, mode=mode)
+class flags:
+    # dlopen() flags, that can be combined with |:
+    NOW = common.RTLD_NOW
+    LAZY = common.RTLD_LAZY
+    GLOBAL = common.RTLD_GLOBAL
+    LOCAL = common.RTLD_LOCAL
 
+
+def c_import(path: PathLike, mode: int = modes.CDECL, prototypes: dict = None, flags: int = None) -> c_module.CModule:
+    """
+    Load the library at 'path', which may also be a name that is looked up
+    in config.C.search_paths, then by the system ("m", "libm.so.6", ...).
+    'prototypes' optionally maps function names to their C signature, as in
+    {"pow": "double (double, double)"}, so that their arguments and results
+    are converted by ctypes. 'flags' are the dlopen() flags of the library,
+    as a combination of c.flags values.
+    Functions are looked up once, then cached on the module.
+    """
+    return c_module.c_import(path, mode=mode, prototypes=prototypes, flags=flags)
+
+
+find_library = common.find_library
+
+parallel_call = common.parallel_call
+
+
+
+RecordFile = records.RecordFile
+
+CCallback = callbacks.CCallback
+CBatchCallback = callbacks.CBatchCallback
+callback_type = callbacks.callback_type
+
+load_header = headers.load_header
+generate_bindings = headers.generate_bindings
@@ -1,5 +1,7 @@
 from ._base_types import *
 from ._const import *
+from ._array import *
+from ._names import *
 from . import _win
 
 
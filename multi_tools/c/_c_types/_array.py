@@ -0,0 +1,305 @@
+from ._base_types import *
+from ._base_types import _readonly
+from ... import common
+import ctypes
+import struct
+import sys
+
+
+def _export(source):
+    # a new export of the buffer of a memoryview, so that views that share memory can be released separately:
+    return memoryview(source) if isinstance(source, memoryview) else source
+
+
+# numpy type kinds of the native struct formats, see CArray.__array_interface__:
+_ARRAY_KINDS = {
+    "?": "b",
+    "b": "i", "h": "i", "i": "i", "l": "i", "q": "i", "n": "i",
+    "B": "u", "H": "u", "I": "u", "L": "u", "Q": "u", "N": "u",
+    "e": "f", "f": "f", "d": "f", "g": "f",
+    "c": "S",
+}
+
+
+def _native_format(fmt: str) -> str:
+    # strip the byte order of buffer formats that use the native one.
+    if fmt[:1] in ("@", "=", "<" if sys.byteorder == "little" else ">"):
+        return fmt[1:]
+    return fmt
+
+
+class CArray:
+    """
+    Contiguous C array of elements of a single C type, stored in one ctypes buffer.
+    Array types are obtained as CArray[element_type], element_type being a CObject
+    subclass or a ctypes type:
+
+    values = CArray[CDouble]([1.0, 2.0, 3.0])
+    zeros = CArray[CInt](1024)
+
+    Slicing with a step of 1 returns an array that shares the memory of the
+    original one. Arrays can be passed directly to foreign functions, as a
+    pointer to their first element.
+
+    numpy.asarray(values) shares the memory of the array. memoryview(values)
+    and numpy.frombuffer(values) require python 3.12+ (buffer protocol), use
+    values.memoryview() on older versions.
+    """
+    __element__ = None
+    __ctype__ = None
+
+    __slots__ = ["_data", "_source"]
+
+    _types = {}
+
+    def __class_getitem__(cls, item):
+        if cls.__element__ is not None:
+            raise TypeError(f"'{cls.__name__}' is already specialized.")
+        try:
+            return cls._types[item]
+        except KeyError:
+            pass
+        ctype = ctype_of(item)
+        if not (isinstance(ctype, type) and issubclass(ctype, CData)):
+            raise TypeError(f"Expected a C type, got '{item}' instead.")
+        name = getattr(item, "__name__", str(item))
+        array_type = type(f"{cls.__name__}[{name}]", (cls,), {
+            "__slots__": (),
+            "__element__": item,
+            "__ctype__": ctype,
+        })
+        cls._types[item] = array_type
+        return array_type
+
+    def __init__(self, init=0):
+        """
+        Create an array of 'init' zeroed elements if it is an int,
+        or a copy of the sequence 'init' otherwise.
+        """
+        ctype = self._check_specialized()
+        self._source = None
+        if isinstance(init, int):
+            self._data = (ctype * init)()
+        else:
+            self._data = (ctype * len(init))()
+            self.assign(init)
+
+    @classmethod
+    def _check_specialized(cls):
+        if cls.__ctype__ is None:
+            raise TypeError("CArray must be specialized with an element type, as in CArray[CInt].")
+        return cls.__ctype__
+
+    @classmethod
+    def _FromCData(cls, data, source=None):
+        self = cls.__new__(cls)
+        self._data = data
+        self._source = source
+        return self
+
+    @classmethod
+    def from_buffer(cls, buffer, count: int = None, offset: int = 0):
+        """
+        Return an array of 'count' elements that is overlaid on the memory
+        of 'buffer' (bytes, bytearray, mmap, array.array, numpy arrays, ...)
+        at 'offset', without copying it.
+        If count is None, the array covers the rest of the buffer.
+        Arrays of read-only buffers are read-only (see 'readonly').
+        """
+        ctype = cls._check_specialized()
+        view = memoryview(buffer)
+        if count is None:
+            count = (view.nbytes - offset) // ctypes.sizeof(ctype)
+        array_type = ctype * count
+        if not view.readonly:
+            return cls._FromCData(array_type.from_buffer(view, offset))
+        if offset < 0 or offset + ctypes.sizeof(array_type) > view.nbytes:
+            raise ValueError(f"Buffer size too small ({view.nbytes} instead of at least "
+                             f"{offset + ctypes.sizeof(array_type)} bytes)")
+        address = common.buffer_address(view)
+        # keeping the view keeps the buffer exported, so that it can't be released (e.g. closed mmaps):
+        return cls._FromCData(array_type.from_address(address + offset), view)
+
+    @classmethod
+    def from_param(cls, obj):
+        """
+        Implement ctypes' from_param(), so that array types can be used
+        as argument types of foreign functions.
+        """
+        if not isinstance(obj, cls):
+            obj = cls(obj)
+        return obj._data
+
+    @property
+    def _as_parameter_(self):
+        return self._data
+
+    @property
+    def __origin__(self):
+        return self._data
+
+    CData = property(lambda self: self._data)
+
+    @property
+    def readonly(self) -> bool:
+        """
+        Whether the array is a view of read-only memory, that can't be
+        changed through it.
+        """
+        return _readonly(self._source)
+
+    def _check_writable(self):
+        if _readonly(self._source):
+            raise TypeError("Array is a view of read-only memory.")
+
+    @property
+    def itemsize(self) -> int:
+        return ctypes.sizeof(self.__ctype__)
+
+    @property
+    def nbytes(self) -> int:
+        return ctypes.sizeof(self._data)
+
+    @property
+    def address(self) -> int:
+        return ctypes.addressof(self._data)
+
+    def memoryview(self) -> memoryview:
+        """
+        Return a memoryview of the array's memory, in the native format of
+        its elements ("d", "i", ...), so that it can be indexed and passed
+        to struct, array or numpy. Elements that have no such format
+        (structs, wide chars, ...) are viewed as bytes ("B").
+        The view is read-only if the array is.
+        """
+        data = memoryview(self._data)
+        view = data.cast("B")
+        # ctypes reports explicit byte orders ("<d"), that memoryviews can't index:
+        item_format = _native_format(data.format)
+        try:
+            if struct.calcsize(item_format) == self.itemsize:
+                view = view.cast(item_format)
+        except (struct.error, TypeError, ValueError):
+            pass
+        if self.readonly:
+            view = view.toreadonly()
+        return view
+
+    def __buffer__(self, flags):
+        """
+        Implement the buffer protocol, so that memoryview(array) works
+        (python 3.12+, use array.memoryview() on older versions).
+        """
+        return self.memoryview()
+
+    @property
+    def __array_interface__(self) -> dict:
+        """
+        NumPy's array interface, so that numpy.asarray() shares the array's
+        memory on every python version. Elements that
+        have no numpy type (structs, ...) are raw bytes ("V").
+        """
+        item_format = _native_format(memoryview(self._data).format)
+        kind = _ARRAY_KINDS.get(item_format)
+        try:
+            if kind is not None and struct.calcsize(item_format) != self.itemsize:
+                kind = None
+        except struct.error:
+            kind = None
+        if kind is None:
+            kind = "V"
+        order = "|" if self.itemsize == 1 or kind in "SV" else ("<" if sys.byteorder == "little" else ">")
+        return {
+            "version": 3,
+            "shape": (len(self._data),),
+            "typestr": f"{order}{kind}{self.itemsize}",
+            "data": (self.address, self.readonly),
+        }
+
+    def to_numpy(self):
+        """
+        Return a numpy array that shares the memory of the array.
+        Requires numpy to be installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("CArray.to_numpy() requires numpy to be installed.") from None
+        result = numpy.ctypeslib.as_array(self._data)
+        if self.readonly:
+            result.flags.writeable = False
+        return result
+
+    @classmethod
+    def from_numpy(cls, ndarray):
+        """
+        Return an array that shares the memory of the numpy array 'ndarray',
+        which must be C-contiguous.
+        """
+        return cls.from_buffer(ndarray)
+
+    def fill(self, value):
+        """
+        Set every element of the array to value.
+        """
+        self._check_writable()
+        if isinstance(value, (int, float)) and value == 0:
+            ctypes.memset(self._data, 0, self.nbytes)
+        else:
+            self._data[:] = [value] * len(self._data)
+
+    def assign(self, values, start: int = 0):
+        """
+        Copy the sequence 'values' into the array, starting at index 'start'.
+        Buffers with the same item format are copied with a single memmove().
+        """
+        self._check_writable()
+        count = len(values)
+        if start < 0 or start + count > len(self._data):
+            raise IndexError("Values don't fit in the array.")
+        if isinstance(values, CArray):
+            values = values._data
+        try:
+            view = memoryview(values)
+        except TypeError:
+            view = None
+        if view is not None and view.c_contiguous and view.ndim == 1 and \
+                _native_format(view.format) == _native_format(memoryview(self._data).format):
+            address = ctypes.addressof(self._data) + start * self.itemsize
+            source = common.buffer_pointer(view)[0]
+            ctypes.memmove(address, source, view.nbytes)
+            return
+        self._data[start:start + count] = values
+
+    def tolist(self) -> list:
+        return self._data[:]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self._data))
+            if step != 1:
+                # non-contiguous slices can't share memory:
+                return type(self)(self._data[item])
+            count = max(stop - start, 0)
+            array_type = self.__ctype__ * count
+            # the slice keeps the owner of the memory alive too:
+            return self._FromCData(array_type.from_buffer(self._data, start * self.itemsize), _export(self._source))
+        value = self._data[item]
+        if isinstance(self.__element__, type) and issubclass(self.__element__, CStruct):
+            source = self if self._source is None else _export(self._source)
+            return self.__element__._FromCData(value, source)
+        return value
+
+    def __setitem__(self, key, value):
+        self._check_writable()
+        self._data[key] = value
+
+    def __repr__(self):
+        return f"<C array of {len(self._data)} '{getattr(self.__element__, '__name__', self.__element__)}' " \
+               f"at {common.format_id(self)}>"
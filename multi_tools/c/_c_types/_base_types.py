@@ -1,38 +1,47 @@
 from ._const import *
+from ... import common
 from typing import TypeVar
 import ctypes
 
 
+def _sup(self, *args, **kwargs):
+    # defined outside of _Wrap, since ctypes' metaclass doesn't support the __class__ cell of super().
+    return super(*args, **kwargs)
+
+
 # a wrapper for our CObject class to handle _ctypes._SimpleCData and it's _type_ attribute.
 def _SimpleCDataWrapper(t_: str = "O") -> type:
     class _Wrap(SimpleCData):
         _type_ = t_
 
-        def __sup__(self, *args, **kwargs):
-            return super(*args, **kwargs)
+        __sup__ = _sup
 
     return _Wrap
 
 
-def _CObjectFromCData(data: CData) -> tuple[type, str]:
-    tp = type(data)
-    if not issubclass(tp, CData):
-        return NoneType
-    tpid = data._type_
-    return _SimpleCDataWrapper(tpid), tpid
+def _readonly(source) -> bool:
+    # whether views whose memory is owned by 'source' (see CStruct._source) must not be written to:
+    if isinstance(source, memoryview):
+        return source.readonly
+    return getattr(source, "readonly", False)
 
 
 # metaclass for our CObject class and it's __typename__ property.
 class _CObjectMeta(type):
-    __slots__ = ["__tprepr__", "_tpname", "__tpid__", "__tpsize__", "__tporigin__"]
 
-    def __new__(mcs, *args, **kwargs):
-        cls = super().__new__(*args, **kwargs)
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        # __typename__ is a property of the metaclass, so it must be set through it:
+        typename = namespace.pop("__typename__", None)
+        # instances only store their ctypes value:
+        namespace.setdefault("__slots__", ())
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
         cls = meta_default_classattr(cls, "__tprepr__", "Object")
         cls = meta_default_classattr(cls, "_tpname", PY_OBJECT)
         cls = meta_default_classattr(cls, "__tpid__", TYPE_INFO[PY_OBJECT][1])
         cls = meta_default_classattr(cls, "__tpsize__", TYPE_INFO[PY_OBJECT][0])
         cls = meta_default_classattr(cls, "__tporigin__", ctypes.py_object)
+        if typename is not None:
+            cls.__typename__ = typename
         return cls
 
     def __init__(cls, *args, **kwargs):
@@ -49,6 +58,43 @@ class _CObjectMeta(type):
         cls.__tpsize__ = tpsize
         cls._tpname = value
 
+    @property
+    def __ctype__(cls):
+        """
+        The ctypes type of the class' values, built the first time
+        it is needed and cached on the class.
+        """
+        ctype = cls.__dict__.get("_ctype")
+        if ctype is None:
+            ctype = cls._BuildCtype()
+            type.__setattr__(cls, "_ctype", ctype)
+        return ctype
+
+
+def ctype_of(tp) -> type:
+    """
+    Return the ctypes type that corresponds to tp, which is a CObject
+    subclass, a CStruct subclass or a ctypes type (returned as is).
+    Simple CObject types give the standard ctypes types, whose
+    values are converted to python values by ctypes.
+    """
+    if isinstance(tp, _CObjectMeta):
+        if issubclass(tp, CStruct):
+            return tp.__origin__
+        return tp.__tporigin__
+    return tp
+
+
+class _Origin:
+    """
+    __origin__ is the ctypes type of CObject subclasses,
+    and the ctypes value of their instances.
+    """
+    def __get__(self, instance, owner):
+        if instance is None:
+            return owner.__ctype__
+        return instance._data
+
 
 _T = TypeVar("_T")
 
@@ -58,31 +104,30 @@ class CObject(object, metaclass=_CObjectMeta):
     __ctype_le__ = None
     __tporigin__ = ctypes.py_object
 
-    __slots__ = ["_data", "__origin__"]
+    __slots__ = ["_data"]
+
+    __origin__ = _Origin()
 
     def __init_subclass__(cls, **kwargs):
         cls.__metaclass__ = _CObjectMeta
         cls.__init_subclass__ = CObject.__init_subclass__
 
     def __init__(self, value):
-        self.__origin__ = value
-        if issubinstance(value, CData):  # to replace with more cleaner function.
-            data_type, tpid = _CObjectFromCData(value)
-            if not (tpid == self.__tpid__):
+        if isinstance(value, SimpleCData):
+            if not (type(value)._type_ == self.__tpid__):
                 raise TypeError(f"Expected python equivalent for '{self.__class__.__name__}', "
                                 f"got '{type(value)}' instead.")
             value = value.value
-        else:
-            data_type = _SimpleCDataWrapper(self.__tpid__)
-        if self.__ctype_be__ is not None:
-            data_type.__ctype_be__ = self.__ctype_be__
-        if self.__ctype_le__ is not None:
-            data_type.__ctype_le__ = self.__ctype_le__
-        self._data = data_type(value)
-        self._data.__repr__ = self.__repr__
+        self._data = type(self).__ctype__(value)
 
-        type(self).__origin__ = data_type
-        # _SimpleCDataWrapper(c_api_type_indicator)(CData_value)
+    @classmethod
+    def _BuildCtype(cls) -> type:
+        data_type = _SimpleCDataWrapper(cls.__tpid__)
+        if cls.__ctype_be__ is not None:
+            data_type.__ctype_be__ = cls.__ctype_be__
+        if cls.__ctype_le__ is not None:
+            data_type.__ctype_le__ = cls.__ctype_le__
+        return data_type
 
     def __repr__(self):
         return f"<C '{self.__tprepr__}' object at 0x{str(hex(id(self))).removeprefix('0x').upper()}>"
@@ -111,64 +156,119 @@ class CObjectPtr(CObject):
         return f"<Pointer to {addr.value} at 0x{str(hex(id(self))).removeprefix('0x').upper()}>"
 
 
-class _StructMeta(type):
-    __slots__ = ["_handle"]
-
-    def __new__(mcs, *args, **kwargs):
-        cls = super().__new__(mcs, *args, **kwargs)
-        return cls
+class _StructMeta(_CObjectMeta):
 
     def __repr__(cls):
         return f"<C struct '{cls.__name__}'>"
 
     @property
     def __tporigin__(cls):
-        return cls._handle
+        return cls.__ctype__
 
 
-class CStruct(CObject):
+class CStruct(CObject, metaclass=_StructMeta):
+    """
+    Base class for C structs. Subclasses declare their layout as
+    __fields__ = [(name, type), ...], where types are CObject subclasses
+    or ctypes types, and optionally __pack__ to set the alignment.
+    Bit fields are declared as (name, type, bits).
+    The layout is compiled into a ctypes.Structure once per subclass.
+    """
     __fields__ = []
+    __pack__ = None
 
-    def __new__(cls, *args, **kwargs):
-        buffer = cls.__repr__
-        cls.__repr__ = lambda s: cls._handle.__repr__()
-        if buffer == CStruct.__repr__:
-            buffer = None
-        ctypesStruct = cls._BuildCtypesStructure()
-        self = super().__new__()
-        self._handle = ctypesStruct(*args, **kwargs)
-        if buffer is not None:
-            self._handle.__repr__ = buffer
-        return self
+    # _data is the ctypes.Structure value, _source the object that owns its memory, if any.
+    __slots__ = ["_source"]
 
     def __init__(self, *args, **kwargs):
-        self._handle.__init__(*args, **kwargs)
-        super().__init__(self._handle)
+        self._data = type(self).__ctype__(*args, **kwargs)
+        self._source = None
 
     @classmethod
-    def _BuildCtypesStructure(cls):
-        class Struct(ctypes.Structure):
-            _fields_ = cls._ConvertFields()
+    def _BuildCtype(cls) -> type:
+        return cls._BuildCtypesStructure()
 
-        return Struct
+    @classmethod
+    def _BuildCtypesStructure(cls):
+        namespace = {"_fields_": cls._ConvertFields(), "__module__": cls.__module__}
+        if cls.__pack__ is not None:
+            namespace["_pack_"] = cls.__pack__
+        return type(cls.__name__, (ctypes.Structure,), namespace)
 
     @classmethod
     def _ConvertFields(cls) -> list[tuple[str, CData]]:
         result = []
         for field in cls.__fields__:
-            name, tp = field
-            new_tp = tp.__origin__
-            result.append((name, new_tp))
+            name, tp, *bits = field  # bit fields are declared as (name, type, bits).
+            if isinstance(tp, _CObjectMeta):
+                tp = tp.__origin__
+            result.append((name, tp, *bits))
 
         return result
 
+    @classmethod
+    def _FromCData(cls, data, source=None):
+        self = cls.__new__(cls)
+        self._data = data
+        self._source = source
+        return self
+
+    @classmethod
+    def from_buffer(cls, buffer, offset: int = 0):
+        """
+        Return a struct that is overlaid on the memory of 'buffer'
+        (bytes, bytearray, mmap, ...) at 'offset', without copying it.
+        Writing to the struct's fields writes to the buffer.
+        Read-only buffers (bytes, ...) give read-only structs, whose fields
+        can't be set (TypeError); fields of nested structs aren't checked.
+        """
+        ctype = cls.__ctype__
+        view = memoryview(buffer)
+        if not view.readonly:
+            return cls._FromCData(ctype.from_buffer(view, offset))
+        if offset < 0 or offset + ctypes.sizeof(ctype) > view.nbytes:
+            raise ValueError(f"Buffer size too small ({view.nbytes} instead of at least "
+                             f"{offset + ctypes.sizeof(ctype)} bytes)")
+        address = common.buffer_address(view)
+        # keeping the view keeps the buffer exported, so that it can't be released (e.g. closed mmaps):
+        return cls._FromCData(ctype.from_address(address + offset), view)
+
+    @classmethod
+    def from_buffer_copy(cls, buffer, offset: int = 0):
+        """
+        Return a struct that holds a copy of the memory of 'buffer' at 'offset'.
+        """
+        return cls._FromCData(cls.__ctype__.from_buffer_copy(buffer, offset))
+
+    @classmethod
+    def view_array(cls, buffer, count: int = None, offset: int = 0):
+        """
+        Return a CArray of 'count' consecutive structs that is overlaid on
+        the memory of 'buffer' at 'offset', without copying it.
+        Structs are only created when they are accessed.
+        If count is None, the array covers the rest of the buffer.
+        """
+        from ._array import CArray
+        return CArray[cls].from_buffer(buffer, count, offset)
+
     def __getattr__(self, item):
-        if item == "__init__":
-            raise TypeError("Structs don't have constructors.")
-        return super().__getattribute__(item)
+        # only called for fields, since instances have no other attributes.
+        if item in CStruct.__slots__ or item == "_data":
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
+        return getattr(self._data, item)
+
+    def __setattr__(self, key, value):
+        if key in CStruct.__slots__ or key == "_data":
+            object.__setattr__(self, key, value)
+        elif hasattr(type(self._data), key):
+            if _readonly(self._source):
+                raise TypeError(f"'{type(self).__name__}' struct is a view of read-only memory.")
+            setattr(self._data, key, value)
+        else:
+            raise AttributeError(f"'{type(self).__name__}' struct has no field '{key}'")
 
     def __repr__(self):
-        return self._handle.__repr__()
+        return self._data.__repr__()
 
 
 class PyObject(CObject):
@@ -271,7 +371,7 @@ class CLongDouble(CObject):
     __tporigin__ = ctypes.c_longdouble
 
 
-check_size(CLongDouble)
+# long double has no struct format character, so its size can't be checked.
 
 
 class CLongLong(CObject):
@@ -351,7 +451,7 @@ class CVoidPtr(CObject):
         return ctypes.c_void_p.from_buffer(self._data)
 
 
-check_size(CVoidPtr)
+check_size(CVoidPtr, "P")
 
 
 class CBool(CObject):
@@ -28,7 +28,7 @@ def issubinstance(obj, tp) -> bool:
 
 def meta_default_classattr(cls, attr_name, default_value):
     if not hasattr(cls, attr_name):
-        cls.__setattr__(attr_name, default_value)
+        setattr(cls, attr_name, default_value)
     return cls
 
 
@@ -79,9 +79,9 @@ TYPE_INFO = {
     "c_byte": size_and_name(ctypes.c_byte, "b"),
     "c_char": size_and_name(ctypes.c_char, "c"),
     "c_char_p": size_and_name(ctypes.c_char_p, "z"),
-    "c_void_p": size_and_name(ctypes.c_void_p, "p"),
+    "c_void_p": size_and_name(ctypes.c_void_p, "P"),
     "c_bool": size_and_name(ctypes.c_bool, "?"),
-    "c_wchar_p": size_and_name(ctypes.c_wchar_p, "z"),
+    "c_wchar_p": size_and_name(ctypes.c_wchar_p, "Z"),
     "c_wchar": size_and_name(ctypes.c_wchar, "u"),
 
     "win_special_variant_bool": size_and_name(wintypes.VARIANT_BOOL, "v"),
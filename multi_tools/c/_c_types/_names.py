@@ -0,0 +1,122 @@
+from ._base_types import *
+import ctypes
+import re
+
+
+# C spellings of types, as used by signature strings:
+C_TYPE_NAMES = {
+    "void": None,
+    "char": CChar,
+    "signed char": CByte,
+    "unsigned char": CUByte,
+    "short": CShort,
+    "short int": CShort,
+    "unsigned short": CUShort,
+    "unsigned short int": CUShort,
+    "int": CInt,
+    "signed": CInt,
+    "signed int": CInt,
+    "unsigned": CUInt,
+    "unsigned int": CUInt,
+    "long": CLong,
+    "long int": CLong,
+    "unsigned long": CULong,
+    "unsigned long int": CULong,
+    "long long": CLongLong,
+    "long long int": CLongLong,
+    "unsigned long long": CULongLong,
+    "unsigned long long int": CULongLong,
+    "float": CFloat,
+    "double": CDouble,
+    "long double": CLongDouble,
+    "bool": CBool,
+    "_Bool": CBool,
+    "wchar_t": CWchar,
+    "PyObject*": PyObject,
+    "size_t": ctypes.c_size_t,
+    "ssize_t": ctypes.c_ssize_t,
+    "Py_ssize_t": ctypes.c_ssize_t,
+    "int8_t": ctypes.c_int8,
+    "uint8_t": ctypes.c_uint8,
+    "int16_t": ctypes.c_int16,
+    "uint16_t": ctypes.c_uint16,
+    "int32_t": ctypes.c_int32,
+    "uint32_t": ctypes.c_uint32,
+    "int64_t": ctypes.c_int64,
+    "uint64_t": ctypes.c_uint64,
+}
+
+# pointers that ctypes represents with their own types:
+_POINTER_TYPES = {
+    "char": ctypes.c_char_p,
+    "wchar_t": ctypes.c_wchar_p,
+    "void": ctypes.c_void_p,
+}
+
+_QUALIFIERS = re.compile(r"\b(const|volatile|restrict|__restrict|struct|enum|union)\b")
+_SIGNATURE = re.compile(r"^\s*(?P<restype>[^(]+?)\s*\((?P<args>.*)\)\s*$")
+
+
+def parse_ctype(spelling: str, names: dict = None) -> type:
+    """
+    Return the ctypes type that corresponds to the C type 'spelling',
+    such as "unsigned int", "const char*" or "double**".
+    'names' maps the spellings of base types to CObject subclasses or
+    ctypes types, and defaults to C_TYPE_NAMES. "void" gives None.
+    """
+    if names is None:
+        names = C_TYPE_NAMES
+    spelling = re.sub(r"\s*\*\s*", "*", " ".join(_QUALIFIERS.sub(" ", spelling).split()))
+    if spelling in names:  # spellings with pointers, like "PyObject*"
+        return ctype_of(names[spelling])
+
+    base = spelling.rstrip("* ")
+    depth = spelling.count("*")
+    if base not in names:
+        raise TypeError(f"Unknown C type: '{spelling}'.")
+    if depth and base in _POINTER_TYPES:
+        result = _POINTER_TYPES[base]
+        depth -= 1
+    else:
+        result = ctype_of(names[base])
+    for _ in range(depth):
+        result = ctypes.POINTER(result)
+    return result
+
+
+def _parse_parameter(spelling: str, names: dict) -> type:
+    try:
+        return parse_ctype(spelling, names)
+    except TypeError:
+        # the parameter may be named, as in "double x":
+        match = re.match(r"^(.*?[\s*])\s*\w+\s*(\[\s*\d*\s*\])?$", spelling)
+        if match is None:
+            raise
+        ctype = parse_ctype(match.group(1), names)
+        if match.group(2):  # arrays parameters are pointers.
+            ctype = ctypes.POINTER(ctype) if ctype is not None else ctypes.c_void_p
+        return ctype
+
+
+def parse_signature(signature: str, names: dict = None) -> tuple:
+    """
+    Parse a function signature such as "double (double x, int)" and
+    return its (restype, argtypes) as ctypes types.
+    Variadic functions ("...") only declare their fixed parameters.
+    """
+    if names is None:
+        names = C_TYPE_NAMES
+    match = _SIGNATURE.match(signature)
+    if match is None:
+        raise ValueError(f"Invalid C signature: '{signature}'.")
+    restype = parse_ctype(match.group("restype"), names)
+
+    argtypes = []
+    args = match.group("args").strip()
+    if args and args != "void":
+        for arg in args.split(","):
+            arg = arg.strip()
+            if arg == "...":
+                break
+            argtypes.append(_parse_parameter(arg, names))
+    return restype, argtypes
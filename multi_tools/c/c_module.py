@@ -1,10 +1,19 @@
-from ctypes import CDLL, WinDLL
+from ctypes import CDLL
 from _ctypes import CFuncPtr
+from .. import config, common
+from . import types
+import os
+import sys
 
 
 CDECL = -1
 STDCALL = -2
 
+if sys.platform == "win32":
+    from ctypes import WinDLL
+else:
+    WinDLL = CDLL  # stdcall only exists on windows.
+
 
 class CModule(object):
 
@@ -13,37 +22,79 @@ class CModule(object):
         STDCALL: WinDLL
     }
 
-    __slots__ = ["_dll", "__name__"]
+    # functions that have been looked up are stored in __dict__, so that
+    # accessing them again doesn't go through __getattr__.
+    __slots__ = ["_dll", "__name__", "__dict__"]
 
-    def __init__(self, path, mode=CDECL):
+    def __init__(self, path, mode=CDECL, prototypes: dict = None, flags: int = None):
+        """
+        Load the library at 'path' with the calling convention 'mode' and the
+        dlopen() flags 'flags' (config.C.dlopen_flags by default). Libraries
+        are only loaded once per process, and shared by the modules that
+        import them.
+        """
         DllType = self._call_methods[mode]
-        self._dll = DllType(path)
-        if '/' in path:
-            nm = path.split('/')[-1]
-        elif '\\' in path:
-            nm = path.split('\\')[-1]
-        else:
-            nm = path
+        if flags is None:
+            flags = config.C.dlopen_flags
+        path = os.fspath(path)
+        self._dll = common.load_library(common.find_library(path), DllType, mode=flags)
+        self.__name__ = os.path.basename(path.replace('\\', '/'))
 
-        self.__name__ = nm
+        if prototypes is not None:
+            for name, signature in prototypes.items():
+                self.prototype(name, signature)
 
     def __getattr__(self, item):
+        self.__dict__[item] = func = self._lookup(item)
+        return func
+
+    def _lookup(self, name):
         try:
-            resFunc = self._dll[item]
+            resFunc = self._dll[name]
         except AttributeError:
-            self._attr_error(item)
+            self._attr_error(name)
             return  # will never occur since AttributeError is raised
         if isinstance(resFunc, CFuncPtr):
             return resFunc
-        self._attr_error(item)
+        self._attr_error(name)
         return  # will never occur since AttributeError is raised
 
+    def prototype(self, name: str, restype=None, *argtypes):
+        """
+        Declare the prototype of function 'name' and return it.
+        The prototype is either a C signature string:
+
+            module.prototype("pow", "double (double, double)")
+
+        or a return type followed by argument types, which are c.types
+        classes or ctypes types (None for void):
+
+            module.prototype("pow", CDouble, CDouble, CDouble)
+
+        Arguments and return values are then converted by ctypes
+        according to the prototype, on every call.
+        """
+        if isinstance(restype, str):
+            if argtypes:
+                raise TypeError("Argument types can't be given with a signature string.")
+            restype, argtypes = types.parse_signature(restype)
+        else:
+            restype = types.ctype_of(restype)
+            argtypes = [types.ctype_of(tp) for tp in argtypes]
+
+        func = self.__dict__.get(name)
+        if func is None:
+            func = self._lookup(name)
+        func.restype = restype
+        func.argtypes = argtypes
+        self.__dict__[name] = func
+        return func
+
     def _attr_error(self, name):
         raise AttributeError(f"'{self.__name__}' library has no attribute '{name}'.")
 
     __origin__ = property(lambda self: self._dll)
 
 
-def c_import(path, mode=CDECL):
-    return CModule(path, mode=mode)
-
+def c_import(path, mode=CDECL, prototypes=None, flags=None):
+    return CModule(path, mode=mode, prototypes=prototypes, flags=flags)
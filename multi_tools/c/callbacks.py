@@ -0,0 +1,166 @@
+from . import types
+from ctypes import CFUNCTYPE, POINTER, c_size_t, c_void_p, cast
+import functools
+import sys
+import threading
+
+
+if sys.platform == "win32":
+    from ctypes import WINFUNCTYPE
+else:
+    WINFUNCTYPE = CFUNCTYPE  # stdcall only exists on windows.
+
+
+# function pointer types, by (restype, argtypes, stdcall):
+_callback_types = {}
+
+# callbacks that native code holds, with the number of times they were retained:
+_retained = {}
+_retained_lock = threading.Lock()
+
+
+def callback_type(restype, *argtypes, stdcall: bool = False) -> type:
+    """
+    Return the ctypes function pointer type of signature restype(*argtypes),
+    types being c.types classes or ctypes types (None for void).
+    Each signature only creates its type once.
+    """
+    key = (restype, argtypes, stdcall)
+    try:
+        return _callback_types[key]
+    except KeyError:
+        pass
+    factory = WINFUNCTYPE if stdcall else CFUNCTYPE
+    result = factory(types.ctype_of(restype), *(types.ctype_of(tp) for tp in argtypes))
+    _callback_types[key] = result
+    return result
+
+
+class Callback:
+    """
+    A python function that can be passed to foreign functions as a C function
+    pointer. Instances are created by the CCallback decorator, and can still
+    be called from python.
+    """
+
+    def __init__(self, function, pointer):
+        functools.update_wrapper(self, function)
+        self._pointer = pointer
+
+    @property
+    def pointer(self):
+        """
+        The C function pointer, as a ctypes object.
+        """
+        return self._pointer
+
+    @property
+    def _as_parameter_(self):
+        return self._pointer
+
+    @property
+    def address(self) -> int:
+        return cast(self._pointer, c_void_p).value
+
+    def retain(self):
+        """
+        Keep the callback alive until release() is called as many times,
+        for native code that keeps the pointer after the call it was given
+        to returns (e.g. registered handlers).
+        """
+        with _retained_lock:
+            _retained[self] = _retained.get(self, 0) + 1
+        return self
+
+    def release(self):
+        """
+        Undo a call to retain().
+        """
+        with _retained_lock:
+            count = _retained.get(self, 0)
+            if count <= 0:
+                raise ValueError("Callback is not retained.")
+            if count == 1:
+                del _retained[self]
+            else:
+                _retained[self] = count - 1
+
+    def __enter__(self):
+        return self.retain()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __call__(self, *args, **kwargs):
+        return self.__wrapped__(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<C callback '{self.__name__}' at 0x{self.address:X}>"
+
+
+class CCallback:
+    """
+    Decorator that turns a python function into a C function pointer of
+    signature restype(*argtypes):
+
+    @CCallback(CInt, CVoidPtr, CVoidPtr)
+    def compare(a, b):
+        ...
+
+    libc.qsort(values, len(values), values.itemsize, compare)
+
+    The decorator can also be used as an argument type of CModule
+    prototypes. Decorated functions stay callable from native code for as
+    long as they exist; see Callback.retain() for pointers that native
+    code keeps.
+    """
+
+    def __init__(self, restype=None, *argtypes, stdcall: bool = False):
+        self.restype = restype
+        self.argtypes = argtypes
+        self.type = callback_type(restype, *argtypes, stdcall=stdcall)
+
+    def _trampoline(self, function):
+        return function
+
+    def __call__(self, function) -> Callback:
+        return Callback(function, self.type(self._trampoline(function)))
+
+    def from_param(self, obj):
+        """
+        Implement ctypes' from_param(), so that the decorator can be used as
+        an argument type of foreign functions.
+        """
+        return self.type.from_param(obj)
+
+
+class CBatchCallback(CCallback):
+    """
+    Same as CCallback, but native code calls the function with a pointer to
+    an array of 'element_type' and its length, followed by 'argtypes', and
+    the function receives them as a CArray:
+
+    @CBatchCallback(CDouble)
+    def on_samples(samples):
+        total = sum(samples)
+
+    This avoids calling the function once per element. The array shares the
+    memory of the native one, and is only valid during the call.
+    """
+
+    def __init__(self, element_type, restype=None, *argtypes, stdcall: bool = False):
+        self.array_type = types.CArray[element_type]
+        super().__init__(restype, POINTER(self.array_type.__ctype__), c_size_t, *argtypes, stdcall=stdcall)
+
+    def _trampoline(self, function):
+        array_type = self.array_type
+        ctype = array_type.__ctype__
+
+        def trampoline(data, length, *args):
+            address = cast(data, c_void_p).value
+            if address is None:
+                values = array_type(0)
+            else:
+                values = array_type._FromCData((ctype * length).from_address(address))
+            return function(values, *args)
+        return trampoline
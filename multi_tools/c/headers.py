@@ -0,0 +1,465 @@
+"""
+Bindings generated from C headers.
+
+load_header() parses a plain C header (function prototypes, typedefs,
+structs, enums and integer #defines) into a python module that declares
+them with c.types, and caches that module on the disk, by the hash of
+the header. Later imports load the cached module without parsing anything:
+
+gl = load_header("mylib.h")
+lib = gl.bind("mylib")  # CModule with the prototypes of the header
+lib.draw(gl.point(1, 2))
+
+Macros with parameters, unions, bit-precise layouts (#pragma pack) and
+declarations that use them are not translated, and are listed in the
+__skipped__ attribute of the generated module.
+"""
+from . import types, c_module, callbacks
+from .. import config
+import ctypes
+import hashlib
+import importlib.util
+import keyword
+import os
+import re
+
+
+CDECL = c_module.CDECL
+
+# changing the generated code must change this, so that cached bindings are regenerated:
+_GENERATOR_VERSION = 1
+
+_COMMENTS = re.compile(r"/\*.*?\*/|//[^\n]*", re.S)
+_DIRECTIVES = re.compile(r"^[ \t]*#(?:[^\n]*\\\n)*[^\n]*", re.M)
+_DEFINE = re.compile(r"^[ \t]*#[ \t]*define[ \t]+(\w+)[ \t]+([^\n]+)$", re.M)
+_EXTERN_C = re.compile(r'\bextern\s*"C"\s*\{?')
+_IGNORED = re.compile(r"\b(?:extern|static|inline|__inline|__inline__|__extension__|__cdecl|__stdcall|"
+                      r"__declspec\s*\([^)]*\)|__attribute__\s*\(\(.*?\)\))")
+_QUALIFIERS = re.compile(r"\b(?:const|volatile|restrict|__restrict|struct|enum|union)\b")
+_INTEGER = re.compile(r"\b(0[xX][0-9a-fA-F]+|\d+)[uUlL]*\b")
+_CONSTANT_EXPR = re.compile(r"^[\w\s+\-*/%()<>|&^~]*$")
+
+_COMPOUND = re.compile(r"^(?P<typedef>typedef\s+)?(?P<kind>struct|enum|union)\s*(?P<tag>\w+)?\s*"
+                       r"(?:\{(?P<body>.*)\})?\s*(?P<names>[^{}]*)$", re.S)
+_CALLBACK = re.compile(r"^(?P<restype>.+?)\(\s*\*\s*(?P<name>\w*)\s*\)\s*\((?P<params>.*)\)$", re.S)
+_FUNCTION = re.compile(r"^(?P<restype>.+?[\s*])(?P<name>\w+)\s*\((?P<params>.*)\)$", re.S)
+_DECLARATOR = re.compile(r"^(?P<type>.*?[\s*])(?P<name>\w+)\s*(?P<arrays>(?:\[[^\]]*\]\s*)*)$", re.S)
+
+# pointers that ctypes represents with their own types:
+_POINTER_EXPRS = {
+    "char": "_ctypes.c_char_p",
+    "wchar_t": "_ctypes.c_wchar_p",
+    "void": "_ctypes.c_void_p",
+}
+
+# modules that generated code has already been loaded from, by path:
+_loaded = {}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _expression_of(tp) -> str:
+    if tp is None:
+        return "None"
+    if getattr(types, tp.__name__, None) is tp:
+        return f"_types.{tp.__name__}"
+    return f"_ctypes.{tp.__name__}"
+
+
+def _py_name(name: str) -> str:
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+def _normalize(spelling: str) -> str:
+    return re.sub(r"\s*\*\s*", "*", " ".join(_QUALIFIERS.sub(" ", spelling).split()))
+
+
+def _split(text: str, separator: str = ",") -> list[str]:
+    """
+    Split text at separators that aren't enclosed in parentheses or braces.
+    """
+    result = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text):
+        if char in "({[":
+            depth += 1
+        elif char in ")}]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            result.append(text[start:i].strip())
+            start = i + 1
+    result.append(text[start:].strip())
+    return [item for item in result if item]
+
+
+def _declarations(source: str):
+    """
+    Yield the top-level declarations of source, without their ';'.
+    Function definitions are yielded without their body.
+    """
+    depth = 0
+    start = 0
+    for i, char in enumerate(source):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth < 0:  # end of an extern "C" block.
+                depth = 0
+                start = i + 1
+            elif depth == 0:
+                head = source[start:source.index("{", start)]
+                if ")" in head and not re.match(r"\s*(typedef|struct|enum|union)\b", head):
+                    yield head.strip()
+                    start = i + 1
+        elif char == ";" and depth == 0:
+            yield source[start:i].strip()
+            start = i + 1
+
+
+class _Parser:
+    def __init__(self):
+        # python expressions of the C types, by spelling:
+        self.names = {spelling: _expression_of(tp) for spelling, tp in types.C_TYPE_NAMES.items()}
+        self.incomplete = set()  # structs that are declared but not defined (yet).
+        self.forward_names = {}  # typedef names of incomplete structs, by tag.
+        self.constants = {}  # values of enums and #defines.
+        self.macros = []  # names of the #defines that are constants.
+        self.code = []  # definitions, in the order of the header.
+        self.functions = {}
+        self.skipped = []
+
+    def constant(self, expression: str):
+        """
+        Return the value of an integer constant expression, or None.
+        """
+        expression = _INTEGER.sub(lambda m: str(int(m.group(1), 16 if m.group(1)[:2] in ("0x", "0X") else 10)),
+                                  expression.strip())
+        if not expression or not _CONSTANT_EXPR.match(expression):
+            return None
+        try:
+            value = eval(expression.replace("/", "//"), {"__builtins__": {}}, dict(self.constants))
+        except Exception:
+            return None
+        return value if isinstance(value, int) else None
+
+    def type_expression(self, spelling: str) -> str:
+        spelling = _normalize(spelling)
+        if spelling in self.names and spelling.rstrip("*") not in self.incomplete:
+            return self.names[spelling]
+
+        base = spelling.rstrip("*")
+        depth = len(spelling) - len(base)
+        if depth and base in _POINTER_EXPRS:
+            expression = _POINTER_EXPRS[base]
+            depth -= 1
+        elif depth and (base in self.incomplete or base not in self.names):
+            return "_ctypes.c_void_p"  # pointers to opaque types, like FILE*.
+        elif base in self.names and base not in self.incomplete:
+            expression = self.names[base]
+        else:
+            raise _Unsupported(f"unknown type '{spelling}'")
+
+        if depth:
+            expression = f"_types.ctype_of({expression})"
+        for _ in range(depth):
+            expression = f"_ctypes.POINTER({expression})"
+        return expression
+
+    def array_expression(self, expression: str, arrays: str) -> str:
+        for size in reversed(re.findall(r"\[([^\]]*)\]", arrays)):
+            count = self.constant(size)
+            if count is None:
+                raise _Unsupported(f"array size '{size}' is not a constant")
+            expression = f"_types.ctype_of({expression}) * {count}"
+        return expression
+
+    def declarator(self, declaration: str):
+        """
+        Return (type expression, name, bits) of a declaration such as
+        "const char *name" or "unsigned flags : 3", name being None for
+        abstract declarations.
+        """
+        declaration, _, bits = declaration.partition(":")
+        bits = self.constant(bits) if bits else None
+        callback = _CALLBACK.match(declaration)
+        if callback is not None:
+            return self.callback_expression(callback), callback.group("name") or None, bits
+        try:
+            return self.type_expression(declaration), None, bits
+        except _Unsupported:
+            match = _DECLARATOR.match(declaration.strip())
+            if match is None:
+                raise
+        expression = self.type_expression(match.group("type"))
+        if match.group("arrays"):
+            expression = self.array_expression(expression, match.group("arrays"))
+        return expression, match.group("name"), bits
+
+    def parameters(self, text: str) -> list[str]:
+        result = []
+        text = text.strip()
+        if text in ("", "void"):
+            return result
+        for parameter in _split(text):
+            if parameter == "...":
+                break  # only the fixed parameters of variadic functions are declared.
+            array = re.search(r"\[[^\]]*\]\s*$", parameter)
+            if array is not None:
+                parameter = parameter[:array.start()]
+            expression = self.declarator(parameter)[0]
+            if array is not None:  # array parameters are pointers.
+                expression = f"_ctypes.POINTER(_types.ctype_of({expression}))"
+            result.append(expression)
+        return result
+
+    def callback_expression(self, match) -> str:
+        restype = self.type_expression(match.group("restype"))
+        params = self.parameters(match.group("params"))
+        return f"_callbacks.callback_type({', '.join([restype, *params])})"
+
+    def define(self, name: str, value: str):
+        value = self.constant(value)
+        if value is not None:
+            self.constants[name] = value
+            self.macros.append(name)
+
+    def declare(self, declaration: str):
+        declaration = " ".join(_IGNORED.sub(" ", declaration).split())
+        if not declaration:
+            return
+        compound = _COMPOUND.match(declaration)
+        if compound is not None and (compound.group("body") is not None or "(" not in compound.group("names")):
+            return self.declare_compound(compound)
+        if declaration.startswith("typedef "):
+            return self.declare_typedef(declaration[len("typedef "):])
+        function = _FUNCTION.match(declaration)
+        if function is not None and "(" not in function.group("restype"):
+            name = function.group("name")
+            self.functions[name] = (self.type_expression(function.group("restype")),
+                                    self.parameters(function.group("params")))
+        # variables aren't bound.
+
+    def declare_compound(self, match):
+        kind, tag, body = match.group("kind"), match.group("tag"), match.group("body")
+        names = [_normalize(name) for name in _split(match.group("names"))] if match.group("typedef") else []
+        # typedef names of pointers to the type, as in "typedef struct {...} point, *ppoint;":
+        pointer_names = [name.lstrip("*") for name in names if name.startswith("*")]
+        names = [name for name in names if not name.startswith("*")]
+        if kind == "union":
+            raise _Unsupported("unions are not supported")
+        if kind == "enum":
+            if body is not None:
+                self.declare_enum(body)
+            for spelling in (tag, *names):
+                if spelling is not None:
+                    self.alias(spelling, "_types.CInt")
+            return
+
+        if body is None:
+            if tag in self.names and tag not in self.incomplete:  # typedef of a defined struct.
+                for spelling in names:
+                    self.alias(spelling, self.names[tag])
+            else:  # forward declaration, or typedef of an opaque struct.
+                for spelling in (tag, *names):
+                    if spelling is not None:
+                        self.incomplete.add(spelling)
+                self.forward_names.setdefault(tag, []).extend(names)
+            for spelling in pointer_names:
+                self.alias(spelling, self.type_expression(f"{tag}*"))
+            return
+
+        if tag is None and not names:
+            raise _Unsupported("anonymous structs are not supported")
+        py_name = _py_name(names[0] if names else tag)
+        if tag is not None:
+            self.incomplete.add(tag)  # pointers to the struct itself are void pointers.
+        fields = self.struct_fields(body)
+        self.code.append(f"class {py_name}(_types.CStruct):")
+        self.code.append("    __fields__ = [")
+        for field in fields:
+            self.code.append(f"        {field},")
+        self.code.append("    ]\n")
+
+        for spelling in (tag, *names, *self.forward_names.pop(tag, ())):
+            if spelling is not None:
+                self.incomplete.discard(spelling)
+                self.alias(spelling, py_name)
+        for spelling in pointer_names:
+            self.alias(spelling, f"_ctypes.POINTER(_types.ctype_of({py_name}))")
+
+    def alias(self, name: str, expression: str):
+        self.names[name] = expression
+        if _py_name(name) != expression:
+            self.code.append(f"{_py_name(name)} = {expression}\n")
+
+    def struct_fields(self, body: str) -> list[str]:
+        fields = []
+        for declaration in _split(body, ";"):
+            declaration = " ".join(_IGNORED.sub(" ", declaration).split())
+            if "{" in declaration:
+                raise _Unsupported("nested struct and union definitions are not supported")
+            declarators = _split(declaration)
+            base_type = None
+            for declarator in declarators:
+                if base_type is None:
+                    expression, name, bits = self.declarator(declarator)
+                    match = _DECLARATOR.match(declarator.partition(":")[0].strip())
+                    base_type = match.group("type").rstrip(" *") if match is not None else ""
+                else:  # other declarators of "int x, *y;"
+                    expression, name, bits = self.declarator(f"{base_type} {declarator}")
+                if name is None:
+                    raise _Unsupported(f"field '{declaration}' has no name")
+                field = f'("{name}", {expression}' + (f", {bits})" if bits is not None else ")")
+                fields.append(field)
+        return fields
+
+    def declare_enum(self, body: str):
+        value = -1
+        for item in _split(body):
+            name, _, expression = item.partition("=")
+            name = name.strip()
+            if expression:
+                value = self.constant(expression)
+                if value is None:
+                    raise _Unsupported(f"enum value '{item}' is not a constant")
+            else:
+                value += 1
+            self.constants[name] = value
+            self.code.append(f"{_py_name(name)} = {value}")
+        self.code.append("")
+
+    def declare_typedef(self, declaration: str):
+        callback = _CALLBACK.match(declaration)
+        if callback is not None:
+            name = callback.group("name")
+            self.code.append(f"{_py_name(name)} = {self.callback_expression(callback)}\n")
+            self.names[name] = _py_name(name)
+            return
+        if _FUNCTION.match(declaration):
+            raise _Unsupported("function types are only supported through pointers")
+        expression, name, _ = self.declarator(declaration)
+        if name is None:
+            raise _Unsupported(f"typedef '{declaration}' has no name")
+        if self.names.get(name) == expression:
+            return  # e.g. typedef of a standard type, like size_t.
+        self.code.append(f"{_py_name(name)} = {expression}\n")
+        self.names[name] = _py_name(name)
+        self.incomplete.discard(name)
+
+    def parse(self, source: str):
+        source = _COMMENTS.sub(" ", source)
+        for name, value in _DEFINE.findall(source):
+            self.define(name, value)
+        source = _EXTERN_C.sub(" ", _DIRECTIVES.sub(" ", source))
+        for declaration in _declarations(source):
+            try:
+                self.declare(declaration)
+            except _Unsupported as e:
+                self.skipped.append(f"{' '.join(declaration.split())}: {e}")
+
+
+def generate_bindings(source: str, filename: str = "<header>") -> str:
+    """
+    Return the source code of a python module that declares the types,
+    constants and functions of the C header 'source'.
+    """
+    parser = _Parser()
+    parser.parse(source)
+    lines = [
+        f'"""',
+        f'Bindings of "{filename}", generated by multi_tools.c.headers.',
+        f'"""',
+        "from multi_tools.c import types as _types, callbacks as _callbacks, headers as _headers",
+        "import ctypes as _ctypes",
+        "",
+        "",
+        "# constants:",
+    ]
+    for name in parser.macros:
+        lines.append(f"{_py_name(name)} = {parser.constants[name]}")
+    lines += ["", "", "# types:", ""]
+    lines += parser.code
+    lines += ["", "# functions, as name: (restype, argtypes):", "__functions__ = {"]
+    for name, (restype, argtypes) in parser.functions.items():
+        argtypes = ", ".join(argtypes) + ("," if len(argtypes) == 1 else "")
+        lines.append(f'    "{name}": ({restype}, ({argtypes})),')
+    lines += ["}", "", "# declarations that couldn't be translated:", f"__skipped__ = {parser.skipped!r}", ""]
+    lines += [
+        "",
+        "def bind(path, mode=_headers.CDECL, flags=None):",
+        '    """',
+        "    Load the library at 'path' with c_import(), and declare the",
+        "    prototypes of the functions of the header that it exports.",
+        '    """',
+        "    return _headers.bind(path, __functions__, mode, flags)",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def parse_functions(source: str) -> dict:
+    """
+    Return the functions that the C source 'source' declares or defines,
+    as a mapping of names to (restype, argtypes) pairs of c.types classes
+    and ctypes types. Functions that use untranslatable types are ignored.
+    """
+    parser = _Parser()
+    parser.parse(source)
+    namespace = {"_types": types, "_ctypes": ctypes, "_callbacks": callbacks}
+    exec("\n".join(parser.code), namespace)  # types that are declared by source.
+    return {name: (eval(restype, namespace), tuple(eval(argtype, namespace) for argtype in argtypes))
+            for name, (restype, argtypes) in parser.functions.items()}
+
+
+def bind(path, functions: dict, mode: int = c_module.CDECL, flags: int = None) -> c_module.CModule:
+    """
+    Load the library at 'path', and declare the prototypes of 'functions',
+    a mapping of function names to (restype, argtypes) pairs. Functions that
+    the library doesn't export are ignored.
+    """
+    module = c_module.CModule(path, mode, flags=flags)
+    for name, (restype, argtypes) in functions.items():
+        try:
+            module.prototype(name, restype, *argtypes)
+        except AttributeError:
+            pass
+    return module
+
+
+def load_header(path: os.PathLike, cache_dir: os.PathLike = None):
+    """
+    Return the module of bindings generated from the C header at 'path'.
+    Generated modules are written to 'cache_dir' (config.C.bindings_path
+    by default) under the hash of the header, so the header is only parsed
+    again once it changed.
+    """
+    if cache_dir is None:
+        cache_dir = config.C.bindings_path
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data + b"\0" + str(_GENERATOR_VERSION).encode()).hexdigest()[:20]
+    stem = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+    module_path = os.path.join(cache_dir, f"{stem}_{digest}.py")
+
+    try:
+        return _loaded[module_path]
+    except KeyError:
+        pass
+
+    if not os.path.exists(module_path):
+        source = generate_bindings(data.decode("utf-8", errors="replace"), os.path.basename(path))
+        os.makedirs(cache_dir, exist_ok=True)
+        temp = f"{module_path}.{os.getpid()}.tmp"
+        with open(temp, "w") as f:
+            f.write(source)
+        os.replace(temp, module_path)
+
+    spec = importlib.util.spec_from_file_location(f"{__name__}.{stem}_{digest}", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _loaded[module_path] = module
+    return module
@@ -0,0 +1,132 @@
+from . import types
+from array import array
+import ctypes
+import mmap
+import os
+
+
+class RecordFile:
+    """
+    Read-only access to a file made of fixed-layout binary records, described
+    by a CStruct subclass. The file is memory-mapped, and records are only
+    turned into python objects when they are accessed, as struct views that
+    share the file's memory.
+
+    with RecordFile(Sample, "samples.bin") as records:
+        first = records[0]
+        times = records.column("time")
+        for chunk in records.chunks(65536):
+            ...
+
+    Trailing bytes that don't make a whole record are ignored.
+    """
+    __slots__ = ["_struct", "_path", "_file", "_mmap", "_records", "_offset", "_count"]
+
+    def __init__(self, struct_type: type[types.CStruct], path: os.PathLike, offset: int = 0):
+        """
+        Map the file at 'path', whose records start at 'offset' (the size of
+        its header, if any).
+        """
+        self._struct = struct_type
+        self._path = path
+        self._offset = offset
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        record_size = ctypes.sizeof(struct_type.__origin__)
+        self._count = max(size - offset, 0) // record_size
+        if self._count:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._records = struct_type.view_array(self._mmap, self._count, offset)
+        else:
+            self._mmap = None  # empty files can't be mapped.
+            self._records = types.CArray[struct_type](0)
+
+    @property
+    def records(self) -> types.CArray:
+        """
+        The records of the file, as a CArray of structs.
+        """
+        return self._records[:]
+
+    @property
+    def record_size(self) -> int:
+        return self._records.itemsize
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, item):
+        return self._records[item]
+
+    def __iter__(self):
+        records = self._records
+        for i in range(self._count):
+            yield records[i]
+
+    def chunks(self, size: int):
+        """
+        Iterate over the records by chunks of at most 'size' records,
+        as CArray views of the file's memory.
+        """
+        for start in range(0, self._count, size):
+            yield self._records[start:start + size]
+
+    def _field(self, name: str):
+        for field_name, field_type in self._records.__ctype__._fields_:
+            if field_name == name:
+                return getattr(self._records.__ctype__, name), field_type
+        raise AttributeError(f"'{self._struct.__name__}' struct has no field '{name}'")
+
+    def column(self, name: str, start: int = 0, stop: int = None, typecode: str = None):
+        """
+        Extract the field 'name' of records start to stop into a new
+        CArray, or into an array.array of type 'typecode' if it is given.
+        Fields are copied with strided slices of the file's memory, without
+        creating any python object per record.
+        """
+        descriptor, field_type = self._field(name)
+        start, stop, _ = slice(start, stop).indices(self._count)
+        count = max(stop - start, 0)
+        size = descriptor.size
+        record_size = self.record_size
+
+        data = bytearray(count * size)
+        if count:
+            base = self._offset + start * record_size + descriptor.offset
+            end = base + count * record_size
+            for byte in range(size):
+                data[byte::size] = self._mmap[base + byte:end + byte:record_size]
+
+        if typecode is not None:
+            result = array(typecode)
+            if result.itemsize != size:
+                raise TypeError(f"Type code '{typecode}' doesn't match the size of field '{name}' ({size} bytes).")
+            result.frombytes(data)
+            return result
+        return types.CArray[field_type].from_buffer(data, count)
+
+    def close(self):
+        """
+        Unmap and close the file. Raises BufferError if views of
+        its records are still alive (records, chunks, ...), in which
+        case the file stays open.
+        """
+        if self._mmap is not None and not self._mmap.closed:
+            # views that were given out have their own export of the map, only ours is released:
+            self._records._source.release()
+            try:
+                self._mmap.close()
+            except BufferError:
+                self._records = self._struct.view_array(self._mmap, self._count, self._offset)
+                raise
+        self._records = types.CArray[self._struct](0)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"<{len(self)} '{self._struct.__name__}' records from \"{self._path}\">"
@@ -33,11 +33,17 @@ C_WCHAR_PTR = _ct.C_WCHAR_P
 TYPE_INFO = _ct.TYPE_INFO
 
 
+# C spellings of types, for signature strings:
+
+C_TYPE_NAMES = _ct.C_TYPE_NAMES
+
+
 # C types
 
 
 CObject = _ct.CObject
 CStruct = _ct.CStruct
+CArray = _ct.CArray
 PyObject = _ct.PyObject
 CShort = _ct.CShort
 CUShort = _ct.CUShort
@@ -60,6 +66,13 @@ CWchar = _ct.CWchar
 CWcharPtr = _ct.CWcharPtr
 
 
+# Conversions to ctypes types:
+
+ctype_of = _ct.ctype_of
+parse_ctype = _ct.parse_ctype
+parse_signature = _ct.parse_signature
+
+
 class _win32:
 
     # types from Windows.h :
@@ -119,6 +132,8 @@ class _win32:
     HWND = _ct.win32.HWND
     SC_HANDLE = _ct.win32.SC_HANDLE
     SERVICE_STATUS_HANDLE = _ct.win32.SERVICE_STATUS_HANDLE
+    LARGE_INTEGER = _ct.win32.LARGE_INTEGER
+    ULARGE_INTEGER = _ct.win32.ULARGE_INTEGER
 
     # structs from Windows.h :
 
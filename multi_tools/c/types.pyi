@@ -1,5 +1,5 @@
 from ctypes import c_int as _int, pointer as _ptr
-from typing import overload, TypeVar
+from typing import overload, TypeVar, Sequence as _Sequence
 
 
 _CData = _int.__bases__[0].__bases__[0]  # _ctypes._CData
@@ -36,6 +36,9 @@ C_WCHAR_PTR: str = ...
 # TYPE_INFO:
 TYPE_INFO: dict[str, tuple[int, str]] = ...
 
+# C spellings of types, for signature strings:
+C_TYPE_NAMES: dict[str, type | None] = ...
+
 
 # standard C types:
 
@@ -49,7 +52,7 @@ class CObject(object):
     __ctype_be__: type[_CData] = None
     __ctype_le__: type[_CData] = None
 
-    __slots__ = ["__origin__"]
+    __slots__ = ["_data"]
 
     def __init_subclass__(cls, **kwargs): ...
 
@@ -71,18 +74,86 @@ class CObject(object):
     def CData(self): ...
 
 
+_S = TypeVar("_S", bound="CStruct")
+
+
 class CStruct(CObject):
     __fields__: _FieldMapping = ...
+    __pack__: int = None
     __tporigin__: type[_CData] = ...
 
-    def __new__(cls, *args, **kwargs): ...
-
     def __init__(self, *args, **kwargs): ...
 
+    @classmethod
+    def from_buffer(cls: type[_S], buffer, offset: int = 0) -> _S: ...
+
+    @classmethod
+    def from_buffer_copy(cls: type[_S], buffer, offset: int = 0) -> _S: ...
+
+    @classmethod
+    def view_array(cls: type[_S], buffer, count: int = None, offset: int = 0) -> CArray: ...
+
     def __repr__(self): ...
 
     def __getattr__(self, item): ...
 
+    def __setattr__(self, key, value): ...
+
+
+_A = TypeVar("_A", bound="CArray")
+
+
+class CArray(object):
+    __element__: type = None
+    __ctype__: type[_CData] = None
+
+    __slots__ = ["_data", "_source"]
+
+    def __class_getitem__(cls, item: type) -> type[CArray]: ...
+
+    @overload
+    def __init__(self, init: int = 0): ...
+
+    @overload
+    def __init__(self, init: _Sequence): ...
+
+    @classmethod
+    def from_buffer(cls: type[_A], buffer, count: int = None, offset: int = 0) -> _A: ...
+
+    @classmethod
+    def from_param(cls, obj) -> _CData: ...
+
+    @classmethod
+    def from_numpy(cls: type[_A], ndarray) -> _A: ...
+
+    @property
+    def CData(self) -> _CData: ...
+
+    @property
+    def itemsize(self) -> int: ...
+
+    @property
+    def nbytes(self) -> int: ...
+
+    @property
+    def address(self) -> int: ...
+
+    def memoryview(self) -> memoryview: ...
+
+    def to_numpy(self): ...
+
+    def fill(self, value) -> None: ...
+
+    def assign(self, values: _Sequence, start: int = 0) -> None: ...
+
+    def tolist(self) -> list: ...
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, item): ...
+
+    def __setitem__(self, key, value): ...
+
 
 class PyObject(CObject):
     __typename__: str = ...
@@ -217,6 +288,13 @@ class CWcharPtr(CObject):
     def lookup(self) -> str: ...
 
 
+# conversions to ctypes types:
+
+def ctype_of(tp: type | None) -> type | None: ...
+def parse_ctype(spelling: str, names: dict[str, type | None] = None) -> type | None: ...
+def parse_signature(signature: str, names: dict[str, type | None] = None) -> tuple[type | None, list[type]]: ...
+
+
 # namespace for 'Windows.h' types:
 
 class win32(_Np):
@@ -1,31 +1,21 @@
 from . import types
+from .. import common, profiling
 import ctypes
 from ctypes import wintypes
+from array import array
 
 
-class TypeWrap:
+def _common_names(*names: str):
+    # wintypes type -> types.win32 type
+    return {getattr(wintypes, n): getattr(types.win32, n) for n in names}
 
-    @staticmethod
-    def _common_name(name: str):
-        key = getattr(wintypes, name)
-        value = getattr(types.win32, name)
-        return {key: value}
 
-    @staticmethod
-    def _reversed_common_name(name: str):
-        key = getattr(types.win32, name)
-        value = getattr(wintypes, name)
-        return {key: value}
+def _reversed_common_names(*names: str):
+    # types.win32 type -> wintypes type
+    return {getattr(types.win32, n): getattr(wintypes, n) for n in names}
 
-    @classmethod
-    def _common_names(cls, *names: str):
-        result = {**{cls._common_name(n) for n in names}}
-        return result
 
-    @classmethod
-    def _reversed_common_names(cls, *names: str):
-        result = {**{cls._reversed_common_name(n) for n in names}}
-        return result
+class TypeWrap:
 
     argTypesMapping = {
         # standard C types:
@@ -52,9 +42,8 @@ class TypeWrap:
 
         # Windows.h types:
         **_reversed_common_names(
-            "BYTE", "WORD", "DWORD", "CHAR", "WCHAR", "INT", "UINT"
-                                                             "FLOAT", "DOUBLE", "BOOLEAN", "BOOL", "VARIANT_BOOL",
-            "LONG",
+            "BYTE", "WORD", "DWORD", "CHAR", "WCHAR", "INT", "UINT",
+            "FLOAT", "DOUBLE", "BOOLEAN", "BOOL", "VARIANT_BOOL", "LONG",
             "ULONG", "SHORT", "USHORT", "WPARAM", "LPARAM", "ATOM", "LANGID",
             "COLORREF", "LGRPID", "LCTYPE", "LCID", "HANDLE", "HACCEL", "HBITMAP",
             "HBRUSH", "HCOLORSPACE", "HDC", "HDESK", "HDWP", "HENHMETAFILE",
@@ -96,7 +85,7 @@ class TypeWrap:
 
         # Windows.h types:
         **_common_names(
-                        "BYTE", "WORD", "DWORD", "CHAR", "WCHAR", "INT", "UINT"
+                        "BYTE", "WORD", "DWORD", "CHAR", "WCHAR", "INT", "UINT",
                         "FLOAT", "DOUBLE", "BOOLEAN", "BOOL", "VARIANT_BOOL", "LONG",
                         "ULONG", "SHORT", "USHORT", "WPARAM", "LPARAM", "ATOM", "LANGID",
                         "COLORREF", "LGRPID", "LCTYPE", "LCID", "HANDLE", "HACCEL", "HBITMAP",
@@ -115,29 +104,48 @@ class TypeWrap:
 
     }
 
+    # types that are passed as pointers to their memory:
+    bufferTypes = {bytearray, memoryview, array}
+
     def __init__(self, func, *args):
         """
         Internal helper for wrapping C function calls and returning to
         c.types.CObject subclass instances.
         """
+        if profiling.enabled:
+            symbol = getattr(func, "__name__", repr(func))
+            self._retval = profiling.profile_call(symbol, func, self._wrap_args, self._wrap_result, args)
+        else:
+            self._retval = self._wrap_result(func(*self._wrap_args(args)))
+
+    @classmethod
+    def _wrap_args(cls, args):
         _args = []
         for arg in args:
             argtype = type(arg)
-            if argtype in self.argTypesMapping:
+            if argtype in cls.argTypesMapping:
                 true_arg = arg.__origin__
 
+            elif isinstance(arg, common.Buffer):
+                # passed as pointer and length:
+                _args.extend(arg.args())
+                continue
+
+            elif argtype in cls.bufferTypes:
+                # passed as a pointer to the object's memory, without copying it:
+                true_arg = common.buffer_pointer(arg)[0]
+
             else:
                 true_arg = arg
             _args.append(true_arg)
+        return _args
 
-        result = func(*_args)
-        if type(result) in self.retTypesMapping:
-            restype = self.retTypesMapping[type(result)]
-            res = restype(result)
-        else:
-            res = result
-
-        self._retval = res
+    @classmethod
+    def _wrap_result(cls, result):
+        if type(result) in cls.retTypesMapping:
+            restype = cls.retTypesMapping[type(result)]
+            return restype(result)
+        return result
 
     ret = property(lambda self: self._retval)
 
@@ -150,6 +158,10 @@ def call_with_wrap(func, *args, **kwargs):
 
     Keyword arguments are converted to positional arguments and are
     added to the end of the standard positional arguments.
+
+    bytearray, memoryview and array.array arguments are passed as
+    pointers to their memory and common.Buffer arguments as a pointer
+    followed by a length, none of them being copied.
     """
     kwds = []
     for key in kwargs:
@@ -19,6 +19,7 @@ class TypeWrap(object):
 
     argTypesMapping: _ArgMapping = ...
     retTypesMapping: _RetMapping = ...
+    bufferTypes: set[type] = ...
 
     def __init__(self, func: _Func, *args: _CValue): ...
 
@@ -1,14 +1,50 @@
-from ctypes import c_bool, c_char_p, c_double, c_long, c_void_p, c_float, c_int, py_object
-from _ctypes import CFuncPtr
+from ctypes import c_bool, c_char_p, c_double, c_long, c_void_p, c_float, c_int, py_object, c_char, c_size_t
+from ctypes import Structure, POINTER, byref, pythonapi, get_errno, set_errno, CDLL, DEFAULT_MODE
+from _ctypes import CFuncPtr, _Pointer, _SimpleCData, FUNCFLAG_PYTHONAPI
+from ctypes.util import find_library as _find_system_library
+from concurrent.futures import ThreadPoolExecutor
+from multi_tools import config
+import builtins
+import os
+import sys
+import threading
 
 
 ERROR_PREFIX = "$*1:"
 
 
+class ErrorModes:
+    """
+    How failures of foreign functions are reported to python:
+
+    - NONE: results are never inspected.
+    - ERRNO: the function fails the POSIX way, by returning -1 or a NULL
+        pointer after storing an error code in errno (see
+        CallResults.register_error()). errno is only read after such
+        results, since successful calls may leave it set: -1 for functions
+        that return signed integers, NULL for those that return pointers or
+        strings. Functions that return other types (void, float, ...) are
+        never checked. The library must be loaded with use_errno=True for
+        the code to be visible.
+    - LAST_ERROR: same as ERRNO, but through SetLastError(); Windows only,
+        the library must be loaded with use_last_error=True.
+    - STRING: the function returns a "$*1:<error name>:<error text>" string,
+        see CallResults.D_FAILURE(). This is the default, every returned
+        string is inspected.
+    """
+    NONE = 0
+    ERRNO = 1
+    LAST_ERROR = 2
+    STRING = 3
+
+
 class CallResults:
     SUCCESS = 0
     FAILURE = 1
 
+    # registered exception types, by error code:
+    errors = {}
+
     @staticmethod
     def D_FAILURE(error_name: str, error_text: str):
         return f"$*1:{error_name}:{error_text}"
@@ -19,10 +55,306 @@ class CallResults:
             raise TypeError("Not a detailed failure.")
         data_str = failure.removeprefix(ERROR_PREFIX)
         data = data_str.split(":")
-        if data[0] in globals():
+        if data[0] in globals() or hasattr(builtins, data[0]):
             return data[0], data[1]
         raise AttributeError(f"'builtins' object has no attribute '{data[0]}'")
 
+    @classmethod
+    def register_error(cls, code: int, exception: type[BaseException]):
+        """
+        Make foreign functions that report error code 'code' raise 'exception'.
+        Unregistered codes raise OSError(code, os.strerror(code)), which
+        python maps to the matching OSError subclass for errno values.
+        """
+        if not code:
+            raise ValueError("Error code 0 means success and can't be registered.")
+        cls.errors[code] = exception
+
+    @classmethod
+    def raise_error(cls, code: int):
+        """
+        Raise the exception that corresponds to error code 'code'.
+        """
+        exception = cls.errors.get(code)
+        if exception is None:
+            raise OSError(code, os.strerror(code))
+        raise exception(f"Foreign function failed with error code {code}.")
+
+
+def _is_null(value) -> bool:
+    return getattr(value, "value", value) is None
+
+
+def _is_null_pointer(value) -> bool:
+    return not value
+
+
+def _is_minus_one(value) -> bool:
+    return getattr(value, "value", value) == -1
+
+
+def _failure_test(restype):
+    """
+    Return the function that tells whether a raw result of C type 'restype'
+    reports a failure in the ERRNO and LAST_ERROR modes, or None if results
+    of that type can't (void, floats, unsigned integers, ...).
+    """
+    if isinstance(restype, type) and issubclass(restype, _Pointer):
+        return _is_null_pointer
+    code = getattr(restype, "_type_", None)
+    if code in ("z", "Z", "P"):  # char*, wchar_t* and void*
+        return _is_null
+    if code in ("b", "h", "i", "l", "q"):  # signed integers
+        return _is_minus_one
+    return None
+
+
+def _check_errno():
+    code = get_errno()
+    if code:
+        set_errno(0)
+        CallResults.raise_error(code)
+
+
+def _check_last_error():
+    code = get_last_error()
+    if code:
+        set_last_error(0)
+        CallResults.raise_error(code)
+
+
+if sys.platform == "win32":
+    from ctypes import get_last_error, set_last_error
+
+
+class _Py_buffer(Structure):
+    _fields_ = [
+        ("buf", c_void_p),
+        ("obj", py_object),
+        ("len", c_size_t),
+        ("itemsize", c_size_t),
+        ("readonly", c_int),
+        ("ndim", c_int),
+        ("format", c_char_p),
+        ("shape", c_void_p),
+        ("strides", c_void_p),
+        ("suboffsets", c_void_p),
+        ("internal", c_void_p),
+    ]
+
+
+_PyBUF_SIMPLE = 0
+pythonapi.PyObject_GetBuffer.argtypes = [py_object, POINTER(_Py_buffer), c_int]
+pythonapi.PyBuffer_Release.argtypes = [POINTER(_Py_buffer)]
+
+
+def buffer_address(obj) -> int:
+    """
+    Return the address of the memory of 'obj', which must support the
+    buffer protocol. The buffer is not kept exported, so the address only
+    stays valid for immutable buffers, as long as 'obj' is alive.
+    """
+    buffer = _Py_buffer()
+    pythonapi.PyObject_GetBuffer(obj, byref(buffer), _PyBUF_SIMPLE)
+    try:
+        return buffer.buf
+    finally:
+        pythonapi.PyBuffer_Release(byref(buffer))
+
+
+def buffer_pointer(obj, writable=False):
+    """
+    Return a pointer to the memory of 'obj', which must support the
+    buffer protocol and be C-contiguous, and its size in bytes.
+    Memory is not copied: writable buffers are exported for as long as
+    the returned pointer is alive, and read-only buffers are immutable.
+    If writable is True, read-only buffers are rejected with TypeError.
+    """
+    view = memoryview(obj)
+    size = view.nbytes
+    if not view.readonly:
+        return (c_char * size).from_buffer(view), size
+    if writable:
+        raise TypeError(f"Expected a writable buffer, got read-only '{type(obj).__name__}' instead.")
+    if isinstance(obj, bytes):
+        return obj, size  # ctypes passes the contents of bytes objects as they are.
+    if not view.c_contiguous:
+        raise BufferError("underlying buffer is not C contiguous")
+    return c_void_p(buffer_address(view)), size
+
+
+class Buffer:
+    """
+    Annotation for parameters of header functions that take an object
+    supporting the buffer protocol (bytes, bytearray, memoryview,
+    array.array, ...). Such an argument is passed to the foreign function
+    as two arguments, a pointer to its memory and its length in bytes,
+    without being copied.
+
+    Instances can also be passed to c.wrapper.call_with_wrap(), where
+    they are expanded the same way.
+    """
+    __slots__ = ["obj", "pointer", "size"]
+
+    writable = False
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.pointer, self.size = buffer_pointer(obj, self.writable)
+
+    def args(self) -> tuple:
+        return self.pointer, c_size_t(self.size)
+
+    @classmethod
+    def to_args(cls, obj) -> tuple:
+        """
+        Return the (pointer, length) arguments that represent obj.
+        """
+        pointer, size = buffer_pointer(obj, cls.writable)
+        return pointer, c_size_t(size)
+
+
+class OutBuffer(Buffer):
+    """
+    Same as Buffer, but the buffer must be writable, so that the foreign
+    function can use it as an output parameter and write its results into it.
+    """
+    __slots__ = []
+
+    writable = True
+
+
+# dlopen() flags, that are only meaningful on unix systems:
+RTLD_NOW = getattr(os, "RTLD_NOW", 0)
+RTLD_LAZY = getattr(os, "RTLD_LAZY", 0)
+RTLD_GLOBAL = getattr(os, "RTLD_GLOBAL", 0)
+RTLD_LOCAL = getattr(os, "RTLD_LOCAL", 0)
+_RTLD_NOLOAD = getattr(os, "RTLD_NOLOAD", 0)
+
+# suffix of shared libraries on the current platform:
+LIBRARY_SUFFIX = {"win32": ".dll", "darwin": ".dylib"}.get(sys.platform, ".so")
+
+# loaded libraries, by (canonical path, loader type, use_errno, use_last_error):
+_libraries = {}
+_global_libraries = set()
+_libraries_lock = threading.Lock()
+
+
+if sys.platform != "win32":
+    # ctypes always adds RTLD_NOW to the flags it gives to dlopen(), so libraries
+    # are opened directly with it, and given to the loader type as a handle.
+    _libdl = CDLL(None)
+    _libdl.dlopen.argtypes = [c_char_p, c_int]
+    _libdl.dlopen.restype = c_void_p
+    _libdl.dlerror.restype = c_char_p
+
+
+def _dlopen(path, mode):
+    if not mode & (RTLD_NOW | RTLD_LAZY):
+        mode |= RTLD_NOW
+    handle = _libdl.dlopen(os.fsencode(path), mode)
+    if not handle:
+        raise OSError(_libdl.dlerror().decode(errors="replace"))
+    return handle
+
+
+def canonical_path(path) -> str:
+    """
+    Return the name that identifies the library at 'path' for the whole
+    process: its real absolute path if it exists, or 'path' itself for names
+    that are resolved by the system loader, like "libm.so.6".
+    """
+    path = os.fspath(path)
+    if os.path.exists(path):
+        return os.path.realpath(path)
+    return path
+
+
+# libraries found by find_library(), by (name, search paths):
+_found_libraries = {}
+
+
+def find_library(name) -> str:
+    """
+    Return the path of library 'name'. Paths are returned as is, and other
+    names are looked up in config.C.search_paths, as they are and with the
+    platform's prefix and suffix ("m" may be found as "libm.so"). Names
+    that aren't found there are looked up with ctypes.util.find_library(),
+    then returned unchanged, so that the system loader searches for them.
+    """
+    name = os.fspath(name)
+    if os.path.dirname(name):
+        return name
+    search_paths = tuple(config.C.search_paths)
+    try:
+        return _found_libraries[name, search_paths]
+    except KeyError:
+        pass
+
+    candidates = [name]
+    if LIBRARY_SUFFIX not in name:
+        candidates.append(name + LIBRARY_SUFFIX)
+        if sys.platform != "win32":
+            candidates.append("lib" + name + LIBRARY_SUFFIX)
+
+    result = None
+    for directory in search_paths:
+        for candidate in candidates:
+            path = os.path.join(directory, candidate)
+            if os.path.isfile(path):
+                result = path
+                break
+        if result is not None:
+            break
+    else:
+        result = _find_system_library(name) or name
+
+    _found_libraries[name, search_paths] = result
+    return result
+
+
+def load_library(path, dll_type=CDLL, mode=DEFAULT_MODE, use_errno=False, use_last_error=False):
+    """
+    Load the library at 'path' with 'dll_type' (ctypes.CDLL, ctypes.WinDLL, ...),
+    or return the one that has already been loaded for the same canonical path
+    and loader, so that each library is only opened once per process and
+    keeps the functions that have been looked up on it.
+    'mode' holds the dlopen() flags. Asking for RTLD_GLOBAL makes the symbols of
+    an already loaded library global.
+    """
+    key = (canonical_path(path), dll_type, use_errno, use_last_error)
+    with _libraries_lock:
+        library = _libraries.get(key)
+        if library is None:
+            handle = _dlopen(key[0], mode) if sys.platform != "win32" else None
+            library = dll_type(key[0], mode=mode, handle=handle, use_errno=use_errno, use_last_error=use_last_error)
+            _libraries[key] = library
+            if mode & RTLD_GLOBAL:
+                _global_libraries.add(key)
+        elif mode & RTLD_GLOBAL and key not in _global_libraries:
+            _dlopen(key[0], mode | _RTLD_NOLOAD)
+            _global_libraries.add(key)
+    return library
+
+
+def _identity(value):
+    return value
+
+
+def _unwrap_str(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if value is not None:
+        return str(value)
+    return value
+
+
+def _check_failure_str(value):
+    if isinstance(value, str) and value.startswith(ERROR_PREFIX):
+        error_name, error_text = CallResults.FAILURE_INFO(value)
+        exception = getattr(builtins, error_name, None) or globals()[error_name]
+        raise exception(error_text)
+
 
 class Dll:
     @staticmethod
@@ -59,17 +391,300 @@ class Dll:
                 raise ValueError("Return value of function is a C pointer that cannot be converted to PyObject*.")
         else:
             raise ValueError("Return value of function is a C value that cannot be converted to PyObject*.")
-        if isinstance(value, str):
-            if value.startswith(ERROR_PREFIX):
-                error_name, error_text = CallResults.FAILURE_INFO(value)
-                raise globals()[error_name](error_text)
-
+        _check_failure_str(value)
         return value
 
     @staticmethod
     def wrap_self(value):
         return py_object(value)
 
+    # converters for arguments and return values, by annotation:
+    arg_converters = {
+        bool: c_bool,
+        float: c_double,
+        int: c_int,
+        str: lambda value: bytes(value, encoding="utf-8"),
+        bytes: _identity,
+    }
+
+    res_converters = {
+        None: lambda value: None,
+        bool: bool,
+        float: _identity,
+        int: _identity,
+        str: _unwrap_str,
+        bytes: _identity,
+    }
+
+    # C types of the values that the converters produce or accept, by annotation
+    # ('int' is C's int, use ctypes types such as c_long or c_size_t for the other integers):
+    res_types = {
+        None: None,
+        bool: c_bool,
+        float: c_double,
+        int: c_int,
+        str: c_char_p,
+        bytes: c_char_p,
+    }
+
+    arg_types = {
+        bool: c_bool,
+        float: c_double,
+        int: c_int,
+        str: c_char_p,
+        bytes: c_char_p,
+    }
+
+    # default way of reporting failures, see ErrorModes (others are chosen per function, e.g. with DllImport):
+    error_mode = ErrorModes.STRING
+
+    _marshallers = {}
+
+    @classmethod
+    def arg_converter(cls, annotation):
+        """
+        Return the function that converts arguments annotated with
+        'annotation' before they are passed to a foreign function.
+        """
+        if isinstance(annotation, type) and hasattr(annotation, "from_param"):
+            return annotation.from_param  # ctypes types and c.types.CArray types.
+        if isinstance(annotation, type) and issubclass(annotation, Buffer):
+            return annotation.to_args
+        try:
+            return cls.arg_converters.get(annotation, cls.basic_type_wrap)
+        except TypeError:  # unhashable annotation
+            return cls.basic_type_wrap
+
+    @classmethod
+    def res_converter(cls, annotation):
+        """
+        Return the function that converts return values annotated with
+        'annotation' when they come back from a foreign function.
+        """
+        if isinstance(annotation, type) and issubclass(annotation, _SimpleCData):
+            return _identity
+        try:
+            return cls.res_converters.get(annotation, cls.basic_type_unwrap)
+        except TypeError:  # unhashable annotation
+            return cls.basic_type_unwrap
+
+    @classmethod
+    def res_type(cls, annotation):
+        """
+        Return the restype that foreign functions get for the return
+        annotation 'annotation' (None for void), or Marshaller.UNKNOWN if it
+        has no C equivalent, in which case ctypes' default (C int) is kept.
+        """
+        if isinstance(annotation, type) and issubclass(annotation, _SimpleCData):
+            return annotation
+        try:
+            return cls.res_types.get(annotation, Marshaller.UNKNOWN)
+        except TypeError:  # unhashable annotation
+            return Marshaller.UNKNOWN
+
+    @classmethod
+    def set_prototype(cls, c_func, function, skip_self=False):
+        """
+        Set the restype and argtypes of the foreign function 'c_func' from the
+        annotations of 'function'. argtypes are only set when every parameter
+        is annotated with a type that has a C equivalent. If skip_self is
+        True, the first parameter is declared as a python object, as it is
+        converted through wrap_self().
+        """
+        annotations = function.__annotations__
+        if "return" in annotations:
+            restype = cls.res_type(annotations["return"])
+            if restype is not Marshaller.UNKNOWN:
+                c_func.restype = restype
+
+        code = function.__code__
+        names = code.co_varnames[:code.co_argcount]
+        argtypes = []
+        if skip_self:
+            names = names[1:]
+            argtypes.append(py_object)
+        for name in names:
+            annotation = annotations.get(name)
+            if isinstance(annotation, type) and issubclass(annotation, Buffer):
+                argtypes += [c_void_p, c_size_t]
+            elif isinstance(annotation, type) and issubclass(annotation, _SimpleCData):
+                argtypes.append(annotation)
+            elif isinstance(annotation, type) and annotation in cls.arg_types:
+                argtypes.append(cls.arg_types[annotation])
+            else:
+                return  # converted by basic_type_wrap(), whose result type depends on the value.
+        c_func.argtypes = argtypes
+
+    @classmethod
+    def compile_marshaller(cls, function, skip_self=False, error_mode=None):
+        """
+        Read the annotations of 'function' and return a Marshaller that
+        converts arguments and return values according to them.
+        Marshallers are cached per signature, so functions that share the
+        same signature share the same Marshaller.
+
+        If skip_self is True, the first parameter of 'function' is
+        ignored, as it is converted through wrap_self().
+        error_mode is one of ErrorModes, and defaults to Dll.error_mode.
+        """
+        if error_mode is None:
+            error_mode = cls.error_mode
+        code = function.__code__
+        names = code.co_varnames[:code.co_argcount]
+        if skip_self:
+            names = names[1:]
+        annotations = function.__annotations__
+        signature = (tuple(annotations.get(n) for n in names), annotations.get("return", Marshaller.UNKNOWN),
+                     error_mode)
+
+        try:
+            return cls._marshallers[signature]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable annotation, can't be cached
+            return Marshaller(*signature)
+
+        marshaller = Marshaller(*signature)
+        cls._marshallers[signature] = marshaller
+        return marshaller
+
+
+class Marshaller:
+    """
+    Converters for the arguments and the return value of a foreign function,
+    compiled once from its annotations so that calls don't need to check
+    the type of each value.
+    """
+    __slots__ = ["arg_converters", "unwrap", "_expanded"]
+
+    UNKNOWN = object()  # return annotation of functions that don't declare any.
+
+    def __init__(self, arg_annotations: tuple, res_annotation=UNKNOWN, error_mode=ErrorModes.NONE):
+        self.arg_converters = tuple(Dll.arg_converter(a) for a in arg_annotations)
+        # indexes of the Buffer arguments, which are passed as (pointer, length) pairs:
+        self._expanded = tuple(i for i, a in enumerate(arg_annotations)
+                               if isinstance(a, type) and issubclass(a, Buffer))
+        restype = Dll.res_type(res_annotation)
+        if restype is self.UNKNOWN:
+            restype = c_int  # ctypes' default, see Dll.set_prototype().
+        if res_annotation is self.UNKNOWN:
+            # basic_type_unwrap() already checks for "$*1:" failure strings.
+            if error_mode == ErrorModes.STRING:
+                error_mode = ErrorModes.NONE
+            self.unwrap = self._checked(Dll.basic_type_unwrap, error_mode, restype)
+        else:
+            self.unwrap = self._checked(Dll.res_converter(res_annotation), error_mode, restype)
+
+    @staticmethod
+    def _checked(converter, error_mode, restype=None):
+        """
+        Return converter, preceded by the failure check of error_mode for
+        results of C type 'restype'.
+        """
+        if error_mode == ErrorModes.NONE:
+            return converter
+        if error_mode == ErrorModes.STRING:
+            def unwrap(value):
+                value = converter(value)
+                _check_failure_str(value)
+                return value
+            return unwrap
+
+        if error_mode == ErrorModes.ERRNO:
+            check = _check_errno
+        elif error_mode == ErrorModes.LAST_ERROR and sys.platform == "win32":
+            check = _check_last_error
+        else:
+            raise ValueError(f"Unknown error mode: {error_mode}.")
+
+        failed = _failure_test(restype)
+        if failed is None:
+            return converter
+
+        def unwrap(value):
+            if failed(value):
+                check()
+            return converter(value)
+        return unwrap
+
+    def wrap(self, args: tuple) -> tuple:
+        """
+        Convert args to values that can be passed to the foreign function.
+        Arguments that are not covered by the signature are converted
+        through Dll.basic_type_wrap().
+        """
+        converters = self.arg_converters
+        if len(args) > len(converters):
+            converters = converters + (Dll.basic_type_wrap,) * (len(args) - len(converters))
+        result = [conv(arg) for conv, arg in zip(converters, args)]
+        for index in reversed(self._expanded):
+            if index < len(result):
+                result[index:index + 1] = result[index]
+        return tuple(result)
+
+
+# persistent thread pool of parallel_call(), created when it is first used. Its size never
+# changes, since other threads may be using it; calls are limited to 'workers' threads by
+# splitting their batches into as many chunks:
+_call_pool = None
+_call_pool_size = min(32, (os.cpu_count() or 1) + 4)
+_call_pool_lock = threading.Lock()
+
+
+def _get_call_pool():
+    global _call_pool
+    if _call_pool is None:
+        with _call_pool_lock:
+            if _call_pool is None:
+                _call_pool = ThreadPoolExecutor(_call_pool_size, thread_name_prefix="multi_tools-call")
+    return _call_pool
+
+
+def _call_batch(native, marshaller, batch):
+    if marshaller is None:
+        return [native(*args) for args in batch]
+    # the whole batch is marshalled before the native calls start:
+    wrapped = [marshaller.wrap(args) for args in batch]
+    unwrap = marshaller.unwrap
+    return [unwrap(native(*args)) for args in wrapped]
+
+
+def parallel_call(func, arg_batches, workers: int = None) -> list:
+    """
+    Call the foreign function 'func' with each argument tuple of 'arg_batches'
+    and return the results, in order.
+    The calls are split across 'workers' threads (the number of CPUs by
+    default) of a persistent thread pool, that is shared by all callers and
+    has at most min(32, CPUs + 4) threads. Foreign functions release the
+    GIL while they run, so CPU-heavy native functions run on all cores at once.
+
+    'func' may be a function of a ctypes library or of a CModule, or a
+    function decorated with DllImport, whose arguments are then marshalled
+    by its compiled Marshaller, once for each batch of calls.
+    Arguments that aren't tuples or lists are passed as a single argument.
+    """
+    native = getattr(func, "__native__", func)
+    marshaller = getattr(func, "__marshaller__", None)
+    if not isinstance(native, CFuncPtr):
+        raise TypeError(f"Expected a foreign function, got '{type(func).__name__}' instead.")
+    if native._flags_ & FUNCFLAG_PYTHONAPI:
+        raise ValueError("Functions of PyDLL libraries hold the GIL, they can't run in parallel.")
+
+    batches = [tuple(args) if isinstance(args, (tuple, list)) else (args,) for args in arg_batches]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(batches) <= 1:
+        return _call_batch(native, marshaller, batches)
+
+    size = -(-len(batches) // workers)
+    pool = _get_call_pool()
+    futures = [pool.submit(_call_batch, native, marshaller, batches[i:i + size])
+               for i in range(0, len(batches), size)]
+    results = []
+    for future in futures:
+        results.extend(future.result())
+    return results
+
 
 def format_id(o: object):
     return "0x" + str(hex(id(o))).removeprefix("0x").upper()
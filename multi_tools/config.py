@@ -1,6 +1,6 @@
 import os
+import sys
 import ctypes
-from multi_tools.system import path
 
 
 class _List:
@@ -39,13 +39,21 @@ class _List:
 
 class Cpp:
     SYS32 = "C:/Windows/System32/"
-    APPDATA = os.getenv('AppData') + '\\.pyCpp\\'  # "C:/Users/XXX/AppData/Roaming/.pyCpp/" or %AppData%
+    if sys.platform == "win32":
+        APPDATA = os.getenv('AppData') + '\\.pyCpp\\'  # "C:/Users/XXX/AppData/Roaming/.pyCpp/" or %AppData%
+    else:
+        APPDATA = os.path.expanduser("~/.pyCpp/")
     search_paths = _List(["", SYS32, APPDATA])
     CDLL = ctypes.CDLL
-    WinDLL = ctypes.WinDLL
+    WinDLL = ctypes.WinDLL if sys.platform == "win32" else ctypes.CDLL  # stdcall only exists on windows.
 
     dll_type = CDLL
 
+    # compiler of the inline C sources of HeaderClass, and where their libraries are cached:
+    compiler = os.getenv("CC", "gcc" if sys.platform == "win32" else "cc")
+    cflags = ["-O2"]
+    build_path = os.path.join(APPDATA, "build")
+
     @search_paths.step
     def check(self, appends):
         for i in appends:
@@ -53,6 +61,32 @@ class Cpp:
                 raise NotADirectoryError(f"Search path '{i}' is not a directory.")
 
 
+class C:
+    # directories where c_import() looks for libraries that are given by name,
+    # before letting the system loader search for them:
+    search_paths = _List([""])
+    # default dlopen() flags of c_import() (see multi_tools.c.flags):
+    dlopen_flags = ctypes.DEFAULT_MODE
+    # directory where c.load_header() caches the bindings it generates:
+    bindings_path = os.path.join(Cpp.APPDATA, "bindings")
+
+    check = search_paths.step(Cpp.check)
+
+
+class Runtime:
+    # size of the worker pool behind system.runtime.thread, and how many calls can wait for a worker:
+    max_workers = min(32, (os.cpu_count() or 1) + 4)
+    queue_size = 1024
+    # seconds a call waits for room in a full queue before raising queue.Full (None waits forever):
+    submit_timeout = None
+    # seconds after which idle threads of system.runtime.ThreadContainer end (they're started again when needed):
+    idle_timeout = 60
+    # size of the process pool behind system.runtime.process, and from how many bytes buffer
+    # arguments and results are passed through shared memory instead of being pickled:
+    max_processes = os.cpu_count() or 1
+    shared_memory_threshold = 64 * 1024
+
+
 class Path:
     slash_convention = '/'
     win_convention = '\\'
@@ -1,4 +1,4 @@
-from multi_tools.cpp import class_extension
+from multi_tools.cpp import class_extension, compiler
 import os
 
 
@@ -7,3 +7,5 @@ import os
 
 HeaderClass = class_extension.HeaderClass  # no need for explanation.
 HeaderFunc = class_extension.HeaderFunc
+
+CompileError = compiler.CompileError
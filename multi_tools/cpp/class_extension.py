@@ -1,6 +1,8 @@
 import ctypes
 import os
-from multi_tools import config, common, functional
+import sys
+from multi_tools import config, common, functional, profiling, sync_dlls
+from multi_tools.cpp import compiler
 from types import FunctionType
 
 
@@ -11,14 +13,62 @@ if not os.path.exists(config.Cpp.APPDATA):
         pass
 
 
+# paths of the libraries found by search_dll(), or None if they weren't found,
+# by (name, search paths):
+_found_dlls = {}
+
+
+def _dll_candidates(name: str):
+    yield name
+    if sys.platform != "win32" and name.endswith('.dll'):
+        # libraries that are shipped as .dll on windows are built as lib<name>.so elsewhere:
+        stem = name.removesuffix('.dll')
+        yield stem + common.LIBRARY_SUFFIX
+        yield "lib" + stem + common.LIBRARY_SUFFIX
+
+
+def _find_dll(name: str):
+    search_paths = tuple(config.Cpp.search_paths)
+    try:
+        return _found_dlls[name, search_paths]
+    except KeyError:
+        pass
+    result = None
+    if name.endswith(('.dll', common.LIBRARY_SUFFIX)):
+        for path in search_paths:
+            for candidate in _dll_candidates(name):
+                if os.path.isfile(path + candidate):
+                    result = path + candidate
+                    break
+            if result is not None:
+                break
+    _found_dlls[name, search_paths] = result
+    return result
+
+
+def clear_search_cache():
+    """
+    Forget the libraries that search_dll() found or didn't find, e.g.
+    after libraries have been installed.
+    """
+    _found_dlls.clear()
+
+
 def search_dll(name: str) -> ctypes.CDLL:
     """
-    Utility for searching .dll libraries.
+    Utility for searching .dll libraries (or .so libraries on linux, where
+    "name.dll" is also looked up as "name.so" and "libname.so").
+    Results are cached for the process, including failures, and libraries
+    are loaded once per path and loader type, so that classes that use the
+    same library share it.
     """
-    for path in config.Cpp.search_paths:
-        if os.path.exists(path + name) and name.endswith('.dll'):
-            return config.Cpp.dll_type(path + name)
-    raise ReferenceError(f"Failed to solve external reference '{name}' in {tuple(config.Cpp.search_paths)}.")
+    sync_dlls()  # in case the update of multi_tools' dlls was deferred.
+    path = _find_dll(name)
+    if path is None:
+        raise ReferenceError(f"Failed to solve external reference '{name}' in {tuple(config.Cpp.search_paths)}.")
+    error_mode = common.Dll.error_mode
+    return common.load_library(path, config.Cpp.dll_type, use_errno=error_mode == common.ErrorModes.ERRNO,
+                               use_last_error=error_mode == common.ErrorModes.LAST_ERROR)
 
 
 def search_method(dll: ctypes.CDLL, name: str):
@@ -47,46 +97,134 @@ class _Header:
         """
 
         self._func = function
+        function_name: str = function.__name__
+        self.special = function_name.startswith('__') and function_name.endswith('__')
+        if self.special:
+            self.true_name = function_name.removeprefix('__').removesuffix('__')
+            self.symbol = f"PySpecial_{self.true_name}"
+        else:
+            self.true_name = function_name
+            self.symbol = f"Py_{function_name}"
 
         def _wrap(self_or_cls, *args):
-            if not hasattr(self_or_cls, '__dll__'):
-                raise TypeError("Owner class must be decorated with '@HeaderClass(dll_name).'")
-            function_name: str = self._func.__name__
-            if function_name.startswith('__') and function_name.endswith('__'):
-
-                true_name = function_name.removeprefix('__').removesuffix('__')
-                return self.wrapper_special(true_name, self_or_cls, *args)
-
-            else:
-                return self.wrapper_normal(function_name, self_or_cls, *args)
+            raise TypeError("Owner class must be decorated with '@HeaderClass(dll_name).'")
 
         _wrap = functional.copy_function_data(function, _wrap)
-        return_type = function.__annotations__.get("return")
+        _wrap.__header__ = self
         self.func = _wrap
-        self.func.restype = self.return_type_logic[return_type]
-
-    @staticmethod
-    def wrapper_special(name, self_or_cls, *args):
-        c_func = search_method(self_or_cls.__dll__, f"PySpecial_{name}")
-        _args = [common.Dll.basic_type_wrap(a) for a in args]
-        args = tuple(_args)
-        self_or_cls = common.Dll.wrap_self(self_or_cls)
-        res = c_func(self_or_cls, *args)
-        if res is not None:
-            if name == "init":
-                # print(res, type(res))
-                return None
-            return common.Dll.basic_type_unwrap(res)
-
-    @staticmethod
-    def wrapper_normal(name, self_or_cls, *args):
-        c_func = search_method(self_or_cls.__dll__, f"Py_{name}")
-        _args = [common.Dll.basic_type_wrap(a) for a in args]
-        args = tuple(_args)
-        self_or_cls = common.Dll.wrap_self(self_or_cls)
-        res = c_func(self_or_cls, *args)
-        if res is not None:
-            return common.Dll.basic_type_unwrap(res)
+
+    def bind(self, dll: ctypes.CDLL, static=False):
+        """
+        Return a function that calls the symbol of the header function in
+        'dll', with arguments and results converted by a Marshaller.
+        The symbol is looked up once, here.
+        """
+        try:
+            c_func = dll[self.symbol]  # a new function object, that can get its own prototype.
+        except AttributeError:
+            raise ReferenceError(f"Failed to solve external reference '{self.symbol}' in library {dll}.") from None
+        marshaller = common.Dll.compile_marshaller(self._func, skip_self=not static)
+        common.Dll.set_prototype(c_func, self._func, skip_self=not static)
+        wrap, unwrap = marshaller.wrap, marshaller.unwrap
+        wrap_self = common.Dll.wrap_self
+
+        # profiled calls go through profiling.profile_call(), see multi_tools.profiling:
+        symbol = f"{os.path.basename(dll._name)}:{self.symbol}"
+        init = self.special and self.true_name == "init"
+
+        def unwrap_result(res):
+            if res is not None and not init:
+                return unwrap(res)
+
+        if static:
+            def bound(*args):
+                if profiling.enabled:
+                    return profiling.profile_call(symbol, c_func, wrap, unwrap_result, args)
+                res = c_func(*wrap(args))
+                if res is not None:
+                    return unwrap(res)
+        elif init:
+            def bound(self_or_cls, *args):
+                if profiling.enabled:
+                    return profiling.profile_call(symbol, c_func, wrap, unwrap_result, args, (wrap_self(self_or_cls),))
+                c_func(wrap_self(self_or_cls), *wrap(args))
+        else:
+            def bound(self_or_cls, *args):
+                if profiling.enabled:
+                    return profiling.profile_call(symbol, c_func, wrap, unwrap_result, args, (wrap_self(self_or_cls),))
+                res = c_func(wrap_self(self_or_cls), *wrap(args))
+                if res is not None:
+                    return unwrap(res)
+
+        bound = functional.copy_function_data(self._func, bound)
+        bound.__header__ = self
+        return bound
+
+
+def _bind_headers(cls):
+    """
+    Replace the header functions of cls and of its bases with functions
+    that are bound to cls.__dll__.
+    """
+    seen = set()
+    for klass in cls.__mro__:
+        for name, value in vars(klass).items():
+            if name in seen:
+                continue
+            seen.add(name)
+            function = value.__func__ if isinstance(value, (staticmethod, classmethod)) else value
+            header = getattr(function, "__header__", None)
+            if header is None:
+                continue
+            bound = header.bind(cls.__dll__, static=isinstance(value, staticmethod))
+            if isinstance(value, (staticmethod, classmethod)):
+                bound = type(value)(bound)
+            setattr(cls, name, bound)
+
+
+def _source_method(c_func, static, init):
+    wrap_self = common.Dll.wrap_self
+    if static:
+        def method(*args):
+            return c_func(*args)
+        return staticmethod(method)
+    if init:
+        def method(self_or_cls, *args):
+            c_func(wrap_self(self_or_cls), *args)
+        return method
+
+    def method(self_or_cls, *args):
+        return c_func(wrap_self(self_or_cls), *args)
+    return method
+
+
+def _bind_source(cls, source: str):
+    """
+    Bind the Py_* and PySpecial_* functions of the inline C source of cls
+    that aren't declared with @HeaderFunc, with the prototypes that the
+    source gives them. Functions whose first parameter is a PyObject* receive
+    the instance, the others become static methods.
+    """
+    from multi_tools.c import headers, types as c_types
+    for symbol, (restype, argtypes) in headers.parse_functions(source).items():
+        if symbol.startswith("PySpecial_"):
+            name = f"__{symbol.removeprefix('PySpecial_')}__"
+        elif symbol.startswith("Py_"):
+            name = symbol.removeprefix("Py_")
+        else:
+            continue
+        if name in vars(cls):
+            continue
+        c_func = cls.__dll__[symbol]
+        c_func.restype = c_types.ctype_of(restype)
+        c_func.argtypes = [c_types.ctype_of(argtype) for argtype in argtypes]
+        # only functions whose first parameter is a PyObject* receive the instance:
+        static = not c_func.argtypes or c_func.argtypes[0] is not ctypes.py_object
+        method = _source_method(c_func, static=static, init=name == "__init__")
+        function = method.__func__ if isinstance(method, staticmethod) else method
+        function.__name__ = name
+        function.__qualname__ = f"{cls.__qualname__}.{name}"
+        setattr(cls, name, method)
 
 
 def HeaderFunc(func):
@@ -119,7 +257,11 @@ def HeaderFunc(func):
     "PySpecial_init" would be searched inside the .dll library.
 
     If the function happens to not be exported by the .dll, python wouldn't find it
-    and a ReferenceError will be raised.
+    and a ReferenceError will be raised when the owner class is decorated.
+
+    Functions are looked up once, when the owner class is decorated, and their
+    return and argument types are declared from the annotations of the header
+    function.
 
 
     Note:
@@ -141,11 +283,14 @@ def HeaderFunc(func):
 
 
 @functional.DecoratorWithParams
-def HeaderClass(cls: type, dll: str, type_: type[ctypes.CDLL] = ctypes.CDLL, no_errors=False):
+def HeaderClass(cls: type, dll: str = None, type_: type[ctypes.CDLL] = ctypes.CDLL, no_errors=False,
+                source: str = None, cflags: list[str] = None):
     """
     -> Parameters:
         dll: 'os.pathlike'
         type_: type[ctypes.CDLL]
+        source: str
+        cflags: list[str]
 
     -> return type: 'type'
 
@@ -159,12 +304,35 @@ def HeaderClass(cls: type, dll: str, type_: type[ctypes.CDLL] = ctypes.CDLL, no_
 
     See 'HeaderFunc' for more details.
 
+    Instead of 'dll', the C source of the library can be given as 'source'. It is
+    compiled with config.Cpp.compiler and 'cflags' (config.Cpp.cflags by default)
+    the first time it is used, and the library is cached in config.Cpp.build_path
+    for the next runs. Its Py_* and PySpecial_* functions that are not declared
+    with @HeaderFunc are bound automatically, with the types of their C prototype.
+    Those whose first parameter is declared as PyObject* are methods that receive
+    the instance, the other ones are static methods:
+
+    @HeaderClass(source='''
+        long Py_add(PyObject *self, long a, long b) { return a + b; }
+        long Py_twice(long a) { return 2 * a; }
+    ''')
+    class Adder:
+        pass
+
+    Adder().add(1, 2)
+    Adder.twice(21)
+
     See example in 'system.memory.Pointer'.
     """
+    if source is not None:
+        dll = compiler.compile_source(source, cflags)
     if no_errors:
         try:
             config.Cpp.dll_type = type_
             cls.__dll__ = search_dll(dll)
+            _bind_headers(cls)
+            if source is not None:
+                _bind_source(cls, source)
             return cls
         except ReferenceError:
 
@@ -179,4 +347,7 @@ def HeaderClass(cls: type, dll: str, type_: type[ctypes.CDLL] = ctypes.CDLL, no_
     else:
         config.Cpp.dll_type = type_
         cls.__dll__ = search_dll(dll)
+        _bind_headers(cls)
+        if source is not None:
+            _bind_source(cls, source)
         return cls
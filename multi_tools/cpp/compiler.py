@@ -0,0 +1,63 @@
+import hashlib
+import os
+import subprocess
+import sys
+import sysconfig
+from multi_tools import config, common
+
+
+class CompileError(Exception):
+    """
+    The C compiler failed to compile some inline source.
+    """
+
+
+def _command(compiler: str, flags: tuple, source_path: str, output_path: str) -> list:
+    command = [compiler, "-shared"]
+    if sys.platform != "win32":
+        command.append("-fPIC")
+    # so that inline sources can include Python.h:
+    command += ["-I", sysconfig.get_paths()["include"], *flags, "-o", output_path, source_path]
+    return command
+
+
+def compile_source(source: str, flags: tuple = None, compiler: str = None, build_path: str = None) -> str:
+    """
+    Compile the C source 'source' into a shared library with the system's C
+    compiler (config.Cpp.compiler), and return the path of that library.
+    Libraries are stored in build_path (config.Cpp.build_path by default),
+    named after the hash of the source, compiler, flags and python version,
+    so the same source is only compiled once, even across runs.
+    'flags' defaults to config.Cpp.cflags.
+    """
+    if flags is None:
+        flags = config.Cpp.cflags
+    if compiler is None:
+        compiler = config.Cpp.compiler
+    if build_path is None:
+        build_path = config.Cpp.build_path
+    flags = tuple(flags)
+
+    # libraries are built against the headers of this interpreter (see _command()), and
+    # build_path is shared by all of them:
+    key = "\0".join((source, compiler, *flags, sysconfig.get_paths()["include"],
+                     sys.implementation.cache_tag or "")).encode()
+    name = "inline_" + hashlib.sha256(key).hexdigest()[:24]
+    output_path = os.path.join(build_path, name + common.LIBRARY_SUFFIX)
+    if os.path.exists(output_path):
+        return output_path
+
+    os.makedirs(build_path, exist_ok=True)
+    source_path = os.path.join(build_path, name + ".c")
+    with open(source_path, "w") as f:
+        f.write(source)
+    # compile to a temporary file, so that other processes never load half-written libraries:
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        result = subprocess.run(_command(compiler, flags, source_path, temp_path), capture_output=True, text=True)
+    except OSError as e:
+        raise CompileError(f"Failed to run C compiler '{compiler}': {e}") from None
+    if result.returncode != 0:
+        raise CompileError(f"Failed to compile inline C source:\n{result.stderr}")
+    os.replace(temp_path, output_path)
+    return output_path
@@ -0,0 +1,155 @@
+"""
+Opt-in profiling of foreign function calls.
+
+While profiling is enabled, calls of HeaderFunc functions, DllImport
+functions and c.wrapper.call_with_wrap() are counted per symbol, and the
+time spent converting arguments and results (marshalling) is measured
+apart from the time spent in the foreign function itself:
+
+with profiling.profile() as prof:
+    run()
+print(prof.report())
+
+When profiling is disabled, calls only pay for checking 'enabled'.
+"""
+from time import perf_counter_ns
+import threading
+
+
+# whether calls are being profiled, see enable() and disable():
+enabled = False
+
+_stats = {}
+_lock = threading.Lock()
+
+
+class CallStats:
+    """
+    Number of calls of a symbol, and the time spent marshalling and
+    in native code for them, in seconds.
+    """
+    __slots__ = ["calls", "_marshal_ns", "_native_ns"]
+
+    def __init__(self, calls=0, marshal_ns=0, native_ns=0):
+        self.calls = calls
+        self._marshal_ns = marshal_ns
+        self._native_ns = native_ns
+
+    marshal_time = property(lambda self: self._marshal_ns / 1e9)
+    native_time = property(lambda self: self._native_ns / 1e9)
+    total_time = property(lambda self: (self._marshal_ns + self._native_ns) / 1e9)
+
+    def __sub__(self, other):
+        return CallStats(self.calls - other.calls, self._marshal_ns - other._marshal_ns,
+                         self._native_ns - other._native_ns)
+
+    def __repr__(self):
+        return f"<CallStats calls={self.calls} marshal_time={self.marshal_time:.6f}s " \
+               f"native_time={self.native_time:.6f}s>"
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """
+    Forget the calls that have been recorded so far.
+    """
+    with _lock:
+        _stats.clear()
+
+
+def stats() -> dict[str, CallStats]:
+    """
+    Return a copy of the statistics that have been recorded, by symbol.
+    """
+    with _lock:
+        return {symbol: CallStats(s.calls, s._marshal_ns, s._native_ns) for symbol, s in _stats.items()}
+
+
+def record(symbol: str, marshal_ns: int, native_ns: int):
+    with _lock:
+        entry = _stats.get(symbol)
+        if entry is None:
+            entry = _stats[symbol] = CallStats()
+        entry.calls += 1
+        entry._marshal_ns += marshal_ns
+        entry._native_ns += native_ns
+
+
+def profile_call(symbol: str, native, wrap, unwrap, args: tuple, prefix: tuple = ()):
+    """
+    Call native(*prefix, *wrap(args)), convert its result with unwrap(),
+    and record the call under 'symbol'. Used by the callers of foreign
+    functions when profiling is enabled.
+    """
+    start = perf_counter_ns()
+    wrapped = wrap(args)
+    native_start = perf_counter_ns()
+    result = native(*prefix, *wrapped)
+    native_end = perf_counter_ns()
+    result = unwrap(result)
+    end = perf_counter_ns()
+    record(symbol, (native_start - start) + (end - native_end), native_end - native_start)
+    return result
+
+
+def report(statistics: dict[str, CallStats] = None, sort_by: str = "total_time") -> str:
+    """
+    Return a table of 'statistics' (all the recorded ones by default),
+    sorted by 'sort_by', one of "calls", "marshal_time", "native_time"
+    and "total_time".
+    """
+    if statistics is None:
+        statistics = stats()
+    rows = sorted(statistics.items(), key=lambda item: getattr(item[1], sort_by), reverse=True)
+    width = max((len(symbol) for symbol in statistics), default=6)
+    lines = [f"{'symbol':<{width}}  {'calls':>10}  {'marshal (s)':>12}  {'native (s)':>12}  {'marshal %':>9}"]
+    for symbol, s in rows:
+        share = 100 * s.marshal_time / s.total_time if s.total_time else 0.0
+        lines.append(f"{symbol:<{width}}  {s.calls:>10}  {s.marshal_time:>12.6f}  {s.native_time:>12.6f}  "
+                     f"{share:>8.1f}%")
+    return "\n".join(lines)
+
+
+class profile:
+    """
+    Context manager that enables profiling in its scope. Its stats() and
+    report() only cover the calls that were made in the scope.
+    """
+
+    def __init__(self):
+        self._was_enabled = False
+        self._before = {}
+        self._after = None
+
+    def __enter__(self):
+        self._was_enabled = enabled
+        self._before = stats()
+        self._after = None
+        enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self._was_enabled:
+            disable()
+        self._after = stats()
+
+    def stats(self) -> dict[str, CallStats]:
+        after = self._after if self._after is not None else stats()
+        result = {}
+        for symbol, s in after.items():
+            delta = s - self._before.get(symbol, CallStats())
+            if delta.calls:
+                result[symbol] = delta
+        return result
+
+    def report(self, sort_by: str = "total_time") -> str:
+        return report(self.stats(), sort_by)
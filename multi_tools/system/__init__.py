@@ -1,17 +1,23 @@
 import sys
 if sys.platform == 'win32':
-    from multi_tools.system import registry, dll
-from multi_tools.system import env, runtime, memory
+    from multi_tools.system import registry
+from multi_tools.system import env, runtime, memory, dll
+from multi_tools import common
 from time import sleep as _slp
+import asyncio
 
 
 thread = runtime.thread
+WorkerPool = runtime.WorkerPool
+pool_stats = runtime.pool_stats
+process = runtime.process
+to_thread = runtime.to_thread
 
 import_module = env.import_module
 
-if sys.platform == 'win32':
-    DLL = dll.Dll
+DLL = dll.Dll
 
+if sys.platform == 'win32':
 
     class dlls:
         _system32 = 'C:/windows/system32'
@@ -26,6 +32,15 @@ def wait(time_secs: int or float):
     return _slp(time_secs)
 
 
+async def async_wait(time_secs: int or float):
+    """
+    Coroutine version of wait(), that doesn't block the event loop:
+
+    await system.async_wait(1)
+    """
+    await asyncio.sleep(time_secs)
+
+
 class Module(env.Module):
     @staticmethod
     def is_installed(name: str):
@@ -34,8 +49,15 @@ class Module(env.Module):
 
 DllImport = dll.DllImport
 
+Buffer = common.Buffer  # annotation for (pointer, length) buffer parameters.
+OutBuffer = common.OutBuffer  # same, for writable output buffers.
+
+parallel_call = common.parallel_call
+
 
 Thread = runtime.ThreadContainer
+Process = runtime.ProcessContainer
+AsyncThread = runtime.AsyncThreadContainer
 
 
 try:
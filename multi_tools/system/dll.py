@@ -1,16 +1,13 @@
 from multi_tools.system.env import Handle
-from multi_tools import common, functional
+from multi_tools import common, functional, profiling
 from typing import Union
 from types import MethodType, FunctionType
 import ctypes
+import dis
 import sys
 from os import PathLike
 
 
-if sys.platform != 'win32':
-    raise NotImplementedError('This library works only on Windows!')
-
-
 VoidPointer = ctypes.c_void_p
 Array = ctypes.Array
 
@@ -18,27 +15,37 @@ Array = ctypes.Array
 class Dll(Handle):
     AnyDll = ctypes.CDLL
     CDll = ctypes.CDLL
-    WinDll = ctypes.WinDLL
+    WinDll = ctypes.WinDLL if sys.platform == 'win32' else ctypes.CDLL  # stdcall only exists on windows.
     PyDll = ctypes.PyDLL
 
     def __init_subclass__(cls, **kwargs):
         raise TypeError("'Dll' class can't be subclassed.")
 
-    def __init__(self, path: str, dll_type=AnyDll):
+    def __init__(self, path: str, dll_type=AnyDll, use_errno=False, use_last_error=False):
         """
         Initialize a new dll handle for path.
         No type hints are created for its functions,
         if you want to create some, you shall use DllImport.
-        """
 
-        x = ctypes.LibraryLoader(dll_type)
-        self._lib = x.LoadLibrary(path)
+        path may also be the name of a library that the system can find,
+        like "m" or "libc.so.6" on linux (see common.find_library()).
+        Libraries are only opened once per process, but each handle has its
+        own loader object, so that the prototypes that are given to its
+        functions (restype, argtypes, ...) aren't seen by other handles.
+
+        use_errno and use_last_error are passed to the ctypes loader,
+        see common.ErrorModes.
+        """
+        shared = common.load_library(common.find_library(path), dll_type, use_errno=use_errno,
+                                     use_last_error=use_last_error)
+        # ctypes caches the functions that are looked up on a loader, so handles can't share it:
+        self._lib = dll_type(shared._name, handle=shared._handle, use_errno=use_errno, use_last_error=use_last_error)
         self._path = path
 
         super().__init__("_lib")
 
     def __getitem__(self, item):
-        return self.__getattribute__(item)
+        return getattr(self, item)
 
     def _attribute_error_message(self, item):
         return f'Dll file "{self.safe_getattr("_path")}" has no function named "{item}".'
@@ -53,15 +60,19 @@ class Dll(Handle):
         Return whether f() has not declared a body,
         in other words, if it does nothing.
         """
-        if f.__code__.co_code == b'd\x01S\x00':  # bytecode for doc and empty code
-            return True
-        if f.__code__.co_code == b'd\x00S\x00':  # bytecode for empty code
-            return True
+        # compare instructions rather than raw bytecode, which changes between python versions:
+        instructions = [i for i in dis.get_instructions(f) if i.opname not in ("RESUME", "NOP", "CACHE")]
+        if len(instructions) == 1:  # python 3.12+
+            return instructions[0].opname == "RETURN_CONST" and instructions[0].argval is None
+        if len(instructions) == 2:  # doc and empty code, or empty code
+            return instructions[0].opname == "LOAD_CONST" and instructions[0].argval is None \
+                and instructions[1].opname == "RETURN_VALUE"
         return False
 
 
 @functional.DecoratorWithParams
-def DllImport(func: Union[FunctionType, MethodType], file: Union[str, PathLike], type_: type[Dll.AnyDll] = Dll.WinDll):
+def DllImport(func: Union[FunctionType, MethodType], file: Union[str, PathLike], type_: type[Dll.AnyDll] = Dll.WinDll,
+              error_mode: int = None):
     """
     Function decorator that implements dll functions
     with custom type hints and documentation.
@@ -88,22 +99,38 @@ def DllImport(func: Union[FunctionType, MethodType], file: Union[str, PathLike],
 
     This syntax is only a user-made type hint for dll functions.
 
+    error_mode tells how the function reports failures, it is one of
+    common.ErrorModes and defaults to common.Dll.error_mode.
+
+    The dll function is looked up once, here, and its return and argument
+    types are declared from the annotations (see common.Dll.set_prototype()).
+
     If you don't need it, please use the 'Dll' class directly.
     """
-    dll = Dll(file, type_)
+    if error_mode is None:
+        error_mode = common.Dll.error_mode
+    dll = Dll(file, type_, use_errno=error_mode == common.ErrorModes.ERRNO,
+              use_last_error=error_mode == common.ErrorModes.LAST_ERROR)
     name = func.__name__
     dll_name = file.split('/')[-1]
 
-    if not hasattr(dll, name):
+    try:
+        # a new function object, so that its prototype isn't shared with other imports:
+        _func = dll.safe_getattr("_lib")[name]
+    except AttributeError:
         # if the function is not found in dll:
-        raise AttributeError("Dll \"{0}\" has no function named \"{1}\".".format(dll_name, name))
+        raise AttributeError("Dll \"{0}\" has no function named \"{1}\".".format(dll_name, name)) from None
+
+    marshaller = common.Dll.compile_marshaller(func, error_mode=error_mode)
+    common.Dll.set_prototype(_func, func)
+    wrap, unwrap = marshaller.wrap, marshaller.unwrap
+
+    symbol = f"{dll_name}:{name}"
 
     def new_function(*args):
-        _func = getattr(dll, name)
-        _args = [common.Dll.basic_type_wrap(a) for a in args]
-        args = tuple(_args)
-        res = _func(*args)
-        return common.Dll.basic_type_unwrap(res)
+        if profiling.enabled:
+            return profiling.profile_call(symbol, _func, wrap, unwrap, args)
+        return unwrap(_func(*wrap(args)))
 
     if func.__defaults__ is not None:
         # if keyword arguments are found in the decorated function:
@@ -114,6 +141,9 @@ def DllImport(func: Union[FunctionType, MethodType], file: Union[str, PathLike],
         raise SystemError("A dll hint function can't declare a body.")
 
     new_function.__doc__ = func.__doc__
+    # used by common.parallel_call() to marshal calls by batches:
+    new_function.__native__ = _func
+    new_function.__marshaller__ = marshaller
 
     return new_function
 
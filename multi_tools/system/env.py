@@ -1,7 +1,15 @@
-from importlib import util
+from importlib import util, import_module as _import_module
 from importlib.machinery import ModuleSpec
 from typing import overload
-from types import MethodType
+from types import MethodType, ModuleType
+import copy
+import sys
+import threading
+
+
+# specs found by import_module(), by module name:
+_specs = {}
+_import_lock = threading.Lock()
 
 
 def module_installed(module: str):
@@ -13,11 +21,58 @@ def module_installed(module: str):
     return False
 
 
-def import_module(module_name: str):
+def find_spec(module_name: str) -> ModuleSpec:
+    """
+    Return the spec of module_name, only searching for it the first time.
+    Raise ModuleNotFoundError if it doesn't exist.
     """
-    Import module programmatically.
+    try:
+        return _specs[module_name]
+    except KeyError:
+        pass
+    spec = util.find_spec(module_name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{module_name}'", name=module_name)
+    _specs[module_name] = spec
+    return spec
+
+
+def import_module(module_name: str) -> ModuleType:
     """
-    return Module(module_name)
+    Import module programmatically, lazily: the module is registered in
+    sys.modules right away, but its code only runs on the first access to
+    one of its attributes. Modules that were already imported are returned
+    as they are.
+
+    Parent packages of dotted names are imported normally, and the module
+    is set as an attribute of its parent, as the import statement does.
+    The module itself is returned, use Module(module_name) for a handle.
+    """
+    try:
+        return sys.modules[module_name]
+    except KeyError:
+        pass
+    # finding the spec imports the parent packages, whose code may import other modules
+    # with import_module(), so the lock is only taken to register the module:
+    spec = find_spec(module_name)
+    if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+        # namespace packages and old-style loaders can't run lazily:
+        return _import_module(module_name)
+    with _import_lock:
+        try:
+            return sys.modules[module_name]
+        except KeyError:
+            pass
+        # the cached spec keeps its own loader:
+        spec = copy.copy(spec)
+        loader = spec.loader = util.LazyLoader(spec.loader)
+        module = util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        loader.exec_module(module)
+        parent, _, child = module_name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+        return module
 
 
 class Handle(object):
@@ -33,6 +88,8 @@ class Handle(object):
         For an example, see the Module class.
         """
         setattr(self, "_target", target_name)
+        # the attributes of the real self, that clear_cache() keeps:
+        setattr(self, "_own_attributes", frozenset(self.__dict__) | {"_own_attributes"})
 
     def safe_getattr(self, name): return self.__super_getattr__(name)  # used to obtain the object's real attributes
 
@@ -46,21 +103,37 @@ class Handle(object):
             return False
         return True
 
+    # whether attributes of the handled object are stored in the handle's __dict__ once they are
+    # found, so that next accesses are plain attribute lookups that never reach __getattr__.
+    # Only enable it for objects whose attributes aren't rebound, see clear_cache().
+    _cache_attributes = True
+
     def __getattr__(self, item):
         """
         Here comes the magic.
         We override getattr(self, item) to give us self.__getattribute__(_target).item
         """
-        # if the real self has an attribute called item:
-        if self.__hasattr__(item):
-            return super().__getattribute__(item)
+        # python only calls __getattr__ when the real self has no attribute called item,
+        # so look it up in the handled object (the fake self):
+        target = super().__getattribute__(super().__getattribute__("_target"))
+        try:
+            value = getattr(target, item)
+        except AttributeError:
+            # if it isn't found either, raise AttributeError with customizable message:
+            raise AttributeError(self._attribute_error_message(item)) from None
+        if self._cache_attributes:
+            super().__getattribute__("__dict__")[item] = value
+        return value
 
-        # if the handled object (the fake self) has an attribute called item:
-        if hasattr(super().__getattribute__(super().__getattribute__("_target")), item):
-            target = super().__getattribute__("_target")
-            return super().__getattribute__(target).__getattribute__(item)
-        # if none of them is found, raise AttributeError with customizable message:
-        raise AttributeError(self._attribute_error_message(item))
+    def clear_cache(self):
+        """
+        Forget the attributes of the handled object that have been cached,
+        so that they are looked up again.
+        """
+        namespace = super().__getattribute__("__dict__")
+        own_attributes = super().__getattribute__("_own_attributes")
+        for name in [name for name in namespace if name not in own_attributes]:
+            del namespace[name]
 
     def _attribute_error_message(self, item) -> str:
         """
@@ -82,6 +155,9 @@ class Handle(object):
 
 
 class Module(Handle):
+    # module globals can be rebound (by the module itself too), so they are always looked up:
+    _cache_attributes = False
+
     @overload
     def __init__(self, module: ModuleSpec): ...
 
@@ -90,16 +166,21 @@ class Module(Handle):
 
     def __init__(self, module=None):
         """
-        Create and return a module object. If an existing module is found, gets
-        a copy of it.
+        Create and return a handle for a module. Names are imported with
+        import_module(), so the handle shares sys.modules; specs give a new
+        copy of the module. Either way, the module runs on first use.
         """
         self._module = None
         if isinstance(module, ModuleSpec):
-            self._module = util.module_from_spec(module)
+            spec = copy.copy(module)
+            loader = spec.loader = util.LazyLoader(module.loader)
+            self._module = util.module_from_spec(spec)
+            loader.exec_module(self._module)
         elif isinstance(module, str):
-            spec = util.find_spec(module)
-            if spec is not None:
-                self._module = util.module_from_spec(spec)
+            try:
+                self._module = import_module(module)
+            except ModuleNotFoundError:
+                pass
 
         Handle.__init__(self, "_module")
 
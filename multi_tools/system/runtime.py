@@ -1,11 +1,273 @@
-from multi_tools import common, functional
+from multi_tools import common, functional, config
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait as _wait_futures
+from multiprocessing import shared_memory, resource_tracker
 from types import FunctionType, MethodType
 from typing import Union
 from threading import Thread
+from time import perf_counter_ns, monotonic
+import threading
+import asyncio
+import weakref
+import atexit
+import queue
+import array
+import importlib
 import sys
 import ctypes
 
 
+class AwaitableFuture(Future):
+    """
+    A concurrent.futures.Future that coroutines can also await:
+
+    result = await threaded_function()
+    """
+
+    def __await__(self):
+        return asyncio.wrap_future(self).__await__()
+
+
+class PoolStats:
+    """
+    A snapshot of a WorkerPool: its threads, how many of them are running a
+    call, how many calls wait for a worker, and the share of the pool's
+    capacity (max_workers) that was spent running calls since it started.
+    """
+    __slots__ = ["workers", "busy", "max_workers", "queue_depth", "queue_size", "submitted", "completed",
+                 "utilisation"]
+
+    def __init__(self, workers, busy, max_workers, queue_depth, queue_size, submitted, completed, utilisation):
+        self.workers = workers
+        self.busy = busy
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.queue_size = queue_size
+        self.submitted = submitted
+        self.completed = completed
+        self.utilisation = utilisation
+
+    def __repr__(self):
+        return f"<PoolStats workers={self.workers}/{self.max_workers} busy={self.busy} " \
+               f"queue={self.queue_depth}/{self.queue_size} submitted={self.submitted} " \
+               f"completed={self.completed} utilisation={self.utilisation:.1%}>"
+
+
+class WorkerPool(Executor):
+    """
+    A bounded pool of worker threads that run calls and report their
+    results through futures (see AwaitableFuture).
+
+    Workers are started as calls come in, up to max_workers, and are kept
+    for the next calls. At most queue_size calls can wait for a worker:
+    submit() then blocks until there is room (backpressure), or raises
+    queue.Full after config.Runtime.submit_timeout seconds.
+    """
+
+    def __init__(self, max_workers: int = None, queue_size: int = None):
+        if max_workers is None:
+            max_workers = config.Runtime.max_workers
+        if queue_size is None:
+            queue_size = config.Runtime.queue_size
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0.")
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._queue = queue.Queue(queue_size)
+        self._workers = []
+        self._idle = threading.Semaphore(0)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # notified when workers take calls from the queue, and on shutdown:
+        self._not_full = threading.Condition(self._lock)
+        self._shutdown = False
+
+        self._busy = 0
+        self._submitted = 0
+        self._completed = 0
+        self._busy_ns = 0
+        self._started_ns = perf_counter_ns()
+
+    def submit(self, function, /, *args, **kwargs) -> AwaitableFuture:
+        """
+        Run function(*args, **kwargs) in a worker, and return the future of
+        its result. Raises RuntimeError if the pool is shut down, also while
+        the call waits for room in the queue.
+        """
+        future = AwaitableFuture()
+        item = (future, function, args, kwargs)
+        timeout = config.Runtime.submit_timeout
+        deadline = None if timeout is None else monotonic() + timeout
+        # calls are queued under the lock that shutdown() takes, so that none can
+        # be queued after the sentinels that stop the workers:
+        run_here = False
+        with self._not_full:
+            while True:
+                if self._shutdown:
+                    raise RuntimeError("Can't submit calls to a pool that was shut down.")
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    pass
+                else:
+                    # workers are started under the lock too, so shutdown() stops all of those that have calls:
+                    self._adjust_workers()
+                    break
+                if getattr(self._local, "worker", False):
+                    # a worker that waits for room in the queue could wait for itself,
+                    # so calls made from workers run right away when the queue is full:
+                    run_here = True
+                    break
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Full
+                self._not_full.wait(remaining)
+            self._submitted += 1
+        if run_here:
+            self._run(item)
+        return future
+
+    def _adjust_workers(self):
+        # called with the lock held. An idle worker will take the call:
+        if self._idle.acquire(blocking=False):
+            return
+        if len(self._workers) < self.max_workers:
+            worker = Thread(target=self._work, name=f"multi_tools-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self):
+        self._local.worker = True
+        while True:
+            item = self._queue.get()
+            with self._not_full:
+                self._not_full.notify()
+            if item is None:
+                return
+            self._run(item)
+            self._idle.release()
+
+    def _run(self, item):
+        future, function, args, kwargs = item
+        if not future.set_running_or_notify_cancel():
+            with self._lock:
+                self._completed += 1
+            return
+        with self._lock:
+            self._busy += 1
+        start = perf_counter_ns()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            elapsed = perf_counter_ns() - start
+            with self._lock:
+                self._busy -= 1
+                self._completed += 1
+                self._busy_ns += elapsed
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            uptime = perf_counter_ns() - self._started_ns
+            utilisation = self._busy_ns / (uptime * self.max_workers) if uptime else 0.0
+            return PoolStats(len(self._workers), self._busy, self.max_workers, self._queue.qsize(), self.queue_size,
+                             self._submitted, self._completed, utilisation)
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False, *, cancel_futures: bool = False):
+        """
+        Stop the workers once they have run the calls that are waiting
+        (or after cancelling them, if cancel_pending is True).
+        If wait is True, return when they're done.
+        cancel_futures is the concurrent.futures.Executor name of cancel_pending.
+        """
+        cancel_pending = cancel_pending or cancel_futures
+        with self._lock:
+            if self._shutdown:
+                workers = []
+            else:
+                self._shutdown = True
+                workers = list(self._workers)
+            # submit() calls that wait for room in the queue fail:
+            self._not_full.notify_all()
+        if cancel_pending:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+                    with self._lock:
+                        self._completed += 1
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WorkerPool:
+    """
+    Return the process-wide pool behind @thread, created on first use
+    from config.Runtime.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool()
+    return _pool
+
+
+def configure_pool(max_workers: int = None, queue_size: int = None) -> WorkerPool:
+    """
+    Replace the process-wide pool with a new one. The previous pool still
+    runs the calls it was given.
+    """
+    global _pool
+    with _pool_lock:
+        previous, _pool = _pool, WorkerPool(max_workers, queue_size)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _pool
+
+
+def _submit(function, args, kwargs) -> AwaitableFuture:
+    # submit to the process-wide pool, or to the one that replaced it if configure_pool() shut it down meanwhile:
+    while True:
+        pool = get_pool()
+        try:
+            return pool.submit(function, *args, **kwargs)
+        except RuntimeError:
+            if get_pool() is pool:
+                raise
+
+
+def pool_stats() -> PoolStats:
+    return get_pool().stats()
+
+
+async def to_thread(function, /, *args, **kwargs):
+    """
+    Run function(*args, **kwargs) in the shared worker pool, and return its
+    result without blocking the event loop. Use it for blocking native or
+    file work in coroutines.
+    """
+    return await _submit(function, args, kwargs)
+
+
 class thread_(object):
     def __init_subclass__(cls, **kwargs):
         raise TypeError("'thread' class can't be subclassed.")
@@ -16,21 +278,43 @@ class thread_(object):
         """
         self._function = function
 
-    def __call__(self, *args, **kwargs):
+    def __call__(self, *args, **kwargs) -> AwaitableFuture:
         """
         Implement self(*args, **kwargs)
+
+        The call runs in the shared worker pool (see get_pool()), and its
+        result or exception is reported by the returned future, that can
+        also be awaited.
         """
-        Thread(target=self._function, args=args, kwargs=kwargs).start()
+        return _submit(self._function, args, kwargs)
 
 
 def thread(f: Union[FunctionType, MethodType]):
+    th = thread_(f)
+
     def inner(*args, **kwargs):
-        th = thread_(f)
         return th(*args, **kwargs)
+
+    inner = functional.copy_function_data(f, inner)
     return inner
 
 
 class ThreadContainer:
+    """
+    Superclass for threaded classes: each container has a long-lived thread
+    that runs main() for every call of start(), one call after the other.
+
+    class Downloader(ThreadContainer):
+        def main(self, url):
+            while not self.stopping:
+                ...
+
+    start() returns the future of main()'s result. stop() asks main() to
+    return (see 'stopping'), cancels the calls that haven't started, and
+    ends the thread. Containers can also be reused through pooled().
+    """
+    # idle containers kept by pooled() and release(), per class:
+    pool_size = 4
 
     def __init_subclass__(cls, start_immediately=False):
         """
@@ -39,13 +323,27 @@ class ThreadContainer:
         class C(cls, start_immediately=False):
         """
         cls._immediate_start = start_immediately
+        cls._idle = []
+        cls._idle_lock = threading.Lock()
+
+    _immediate_start = False
+    _idle = []
+    _idle_lock = threading.Lock()
 
     def __init__(self, args: tuple = None, kwargs: dict = None):
         """
         Superclass for threaded classes.
         """
-        self._locked = False
+        self._lock = threading.Lock()
         self._thread = None
+        self._jobs = queue.Queue()
+        self._stop_event = threading.Event()
+        self._idle_event = threading.Event()
+        self._idle_event.set()
+        self._pending = 0
+        self._pooled = False
+        self._local = threading.local()
+        _containers.add(self)
 
         if self._immediate_start:
             if args is None:
@@ -56,26 +354,144 @@ class ThreadContainer:
 
     def _call(self, *args, **kwargs):
         """
-        Method that is called at the start of the thread.
+        Method that is called for each start() in the thread.
         """
-        self.main(*args, **kwargs)
-        self._locked = False
+        return self.main(*args, **kwargs)
+
+    def _loop(self, jobs: queue.Queue, stop_event: threading.Event):
+        self._local.stop_event = stop_event
+        while True:
+            try:
+                job = jobs.get(timeout=config.Runtime.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    # end threads that have been idle for a while, start() makes a new one:
+                    if jobs.empty() and self._thread is threading.current_thread():
+                        self._thread = None
+                        return
+                continue
+            if job is None:
+                return
+            future, args, kwargs = job
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = self._call(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            with self._lock:
+                self._pending -= 1
+                if not self._pending:
+                    self._idle_event.set()
 
     def main(self, *args, **kwargs):
         """
         The thread's lifetime, actions.
         You may override this to customize what the thread does.
+        Long-running loops should return once 'stopping' is True.
         """
         pass
 
-    def start(self, *args, **kwargs):
+    def start(self, *args, **kwargs) -> AwaitableFuture:
+        """
+        Method that starts the thread, or queues another call of main()
+        if it is already running. Return the future of main()'s result.
+        """
+        future = AwaitableFuture()
+        with self._lock:
+            if self._thread is None:
+                # a thread that was stopped may still be running, give the new one its own queue and event:
+                self._stop_event = threading.Event()
+                self._jobs = queue.Queue()
+                self._thread = Thread(target=self._loop, args=(self._jobs, self._stop_event), daemon=True)
+                self._thread.start()
+            self._pending += 1
+            self._idle_event.clear()
+            self._jobs.put((future, args, kwargs))
+        return future
+
+    @property
+    def stopping(self) -> bool:
         """
-        Method that starts the thread.
+        Whether stop() was called, main() should return as soon as it can.
         """
-        if not self._locked:
-            self._locked = True
-            self._thread = Thread(target=self._call, args=args, kwargs=kwargs)
-            self._thread.start()
+        return getattr(self._local, "stop_event", self._stop_event).is_set()
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether main() is running or queued.
+        """
+        return not self._idle_event.is_set()
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Wait until every call of main() has returned, and return whether
+        they have (False if 'timeout' seconds passed first).
+        """
+        return self._idle_event.wait(timeout)
+
+    def stop(self, wait: bool = True, timeout: float = None, cancel_pending: bool = True):
+        """
+        Cancel the calls of main() that haven't started (unless
+        cancel_pending is False), tell the running ones to stop (see
+        'stopping') and end the thread. If wait is True, wait for it (at
+        most 'timeout' seconds).
+        """
+        with self._lock:
+            thread = self._thread
+            self._stop_event.set()
+            while cancel_pending:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                job[0].cancel()
+                self._pending -= 1
+            if not self._pending:
+                self._idle_event.set()
+            if thread is not None:
+                self._jobs.put(None)
+                self._thread = None
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    @classmethod
+    def pooled(cls, *args, **kwargs):
+        """
+        Return an idle container of this class whose thread is already
+        started, or a new one (created with *args, **kwargs).
+        Give it back with release(), or use it in a 'with' block.
+        """
+        with cls._idle_lock:
+            container = cls._idle.pop() if cls._idle else None
+        if container is None:
+            container = cls(*args, **kwargs)
+        container._pooled = True
+        return container
+
+    def release(self):
+        """
+        Give a container that was returned by pooled() back, once its calls
+        of main() have returned. It is stopped if the pool is full.
+        """
+        self.join()
+        cls = type(self)
+        with cls._idle_lock:
+            if not self.stopping and len(cls._idle) < cls.pool_size:
+                cls._idle.append(self)
+                return
+        self.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._pooled:
+            self.release()
+        else:
+            self.stop()
 
     @property
     def thread(self):
@@ -104,6 +520,436 @@ class ThreadContainer:
             file.flush()
 
 
+class AsyncThreadContainer(ThreadContainer):
+    """
+    ThreadContainer for asyncio code: calls of main() run in the shared
+    worker pool (see get_pool()) instead of a thread of their own, so they
+    may run concurrently, and start() returns futures that can be awaited:
+
+    class Reader(AsyncThreadContainer):
+        def main(self, path):
+            with open(path, "rb") as f:
+                return f.read()
+
+    data = await Reader().start("data.bin")
+
+    stop(), 'stopping', pooled() and release() work like with
+    ThreadContainer, and join() has a coroutine version, wait().
+    """
+
+    def __init__(self, args: tuple = None, kwargs: dict = None):
+        self._futures = set()
+        super().__init__(args, kwargs)
+
+    def _run_job(self, stop_event, args, kwargs):
+        # 'stopping' reads the event of the start() call from the worker:
+        self._local.stop_event = stop_event
+        try:
+            return self._call(*args, **kwargs)
+        finally:
+            del self._local.stop_event
+
+    def start(self, *args, **kwargs) -> AwaitableFuture:
+        """
+        Run main(*args, **kwargs) in the shared worker pool, and return the
+        future of its result.
+        """
+        with self._lock:
+            if self._stop_event.is_set():
+                # calls that were started before stop() keep their event:
+                self._stop_event = threading.Event()
+            stop_event = self._stop_event
+            self._pending += 1
+            self._idle_event.clear()
+        try:
+            future = _submit(self._run_job, (stop_event, args, kwargs), {})
+        except BaseException:
+            self._forget(None)
+            raise
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+            self._pending -= 1
+            if not self._pending:
+                self._idle_event.set()
+
+    def stop(self, wait: bool = True, timeout: float = None, cancel_pending: bool = True):
+        """
+        Cancel the calls of main() that haven't started (unless
+        cancel_pending is False) and tell the running ones to stop (see
+        'stopping'). If wait is True, wait for them (at most 'timeout'
+        seconds).
+        """
+        with self._lock:
+            self._stop_event.set()
+            futures = list(self._futures)
+        if cancel_pending:
+            for future in futures:
+                future.cancel()
+        if wait:
+            self.join(timeout)
+
+    async def wait(self, timeout: float = None) -> bool:
+        """
+        Coroutine version of join().
+        """
+        with self._lock:
+            futures = [asyncio.wrap_future(future) for future in self._futures]
+        if not futures:
+            return True
+        done, pending = await asyncio.wait(futures, timeout=timeout)
+        return not pending
+
+
+class _Shared:
+    """
+    A buffer argument or result that is passed to or from a worker process
+    through shared memory, instead of being pickled.
+    """
+    __slots__ = ["name", "kind", "size", "info"]
+
+    def __init__(self, name, kind, size, info):
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.info = info
+
+    def __getstate__(self):
+        return self.name, self.kind, self.size, self.info
+
+    def __setstate__(self, state):
+        self.name, self.kind, self.size, self.info = state
+
+
+def _share(value, names: list):
+    """
+    Return a _Shared copy of value if it is a large buffer (bytes, bytearray,
+    array.array or CArray), and value itself otherwise. The names of the
+    shared memory blocks are added to 'names'.
+    """
+    from multi_tools.c._c_types._array import CArray
+    if isinstance(value, (bytes, bytearray)):
+        kind, info, view = type(value), None, memoryview(value)
+    elif isinstance(value, array.array):
+        kind, info, view = array.array, value.typecode, memoryview(value)
+    elif isinstance(value, CArray) and type(value).__element__ is not None:
+        kind, info, view = CArray, type(value).__element__, value.memoryview()
+    else:
+        return value
+    with view:
+        view = view.cast("B")
+        if view.nbytes < config.Runtime.shared_memory_threshold:
+            return value
+        block = shared_memory.SharedMemory(create=True, size=view.nbytes)
+        try:
+            block.buf[:view.nbytes] = view
+        finally:
+            block.close()
+    names.append(block.name)
+    return _Shared(block.name, kind, view.nbytes, info)
+
+
+def _unshare(value):
+    """
+    Undo _share(): copy a _Shared value out of its shared memory block,
+    that stays allocated.
+    """
+    if not isinstance(value, _Shared):
+        return value
+    from multi_tools.c._c_types._array import CArray
+    block = shared_memory.SharedMemory(value.name)
+    try:
+        data = block.buf[:value.size]
+        if value.kind is array.array:
+            result = array.array(value.info)
+            result.frombytes(data)
+        elif value.kind is CArray:
+            array_type = CArray[value.info]
+            result = array_type(value.size // ctypes.sizeof(array_type.__ctype__))
+            with result.memoryview() as view:
+                view.cast("B")[:] = data
+        else:
+            result = value.kind(data)
+        data.release()
+    finally:
+        block.close()
+    return result
+
+
+def _unlink(names: list):
+    for name in names:
+        try:
+            block = shared_memory.SharedMemory(name)
+        except FileNotFoundError:
+            continue
+        block.close()
+        block.unlink()
+
+
+class _FunctionRef:
+    """
+    Picklable reference to a @process function, that worker processes
+    import by name.
+    """
+    __slots__ = ["module", "qualname"]
+
+    _resolved = {}
+
+    def __init__(self, module, qualname):
+        self.module = module
+        self.qualname = qualname
+
+    def __getstate__(self):
+        return self.module, self.qualname
+
+    def __setstate__(self, state):
+        self.module, self.qualname = state
+
+    def __call__(self, *args, **kwargs):
+        key = (self.module, self.qualname)
+        try:
+            function = self._resolved[key]
+        except KeyError:
+            function = importlib.import_module(self.module)
+            for name in self.qualname.split("."):
+                function = getattr(function, name)
+            # the module's attribute is the decorated function:
+            function = self._resolved[key] = getattr(function, "__process_target__", function)
+        return function(*args, **kwargs)
+
+
+def _call_in_process(target, args, kwargs):
+    # runs in the worker processes:
+    args = tuple(_unshare(arg) for arg in args)
+    kwargs = {name: _unshare(arg) for name, arg in kwargs.items()}
+    # the parent process unlinks the result's block once it copied it:
+    return _share(target(*args, **kwargs), [])
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the process-wide pool behind @process and ProcessContainer,
+    created on first use with config.Runtime.max_processes workers.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # so that workers share the tracker of the shared memory blocks they create:
+                resource_tracker.ensure_running()
+                _process_pool = ProcessPoolExecutor(config.Runtime.max_processes)
+    return _process_pool
+
+
+def configure_process_pool(max_processes: int = None) -> ProcessPoolExecutor:
+    """
+    Replace the process-wide pool with a new one of max_processes workers.
+    The previous pool still runs the calls it was given.
+    """
+    global _process_pool
+    resource_tracker.ensure_running()
+    with _process_pool_lock:
+        previous = _process_pool
+        _process_pool = ProcessPoolExecutor(max_processes or config.Runtime.max_processes)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _process_pool
+
+
+def _submit_to_process(target, args: tuple, kwargs: dict) -> AwaitableFuture:
+    names = []
+    try:
+        args = tuple(_share(arg, names) for arg in args)
+        kwargs = {name: _share(arg, names) for name, arg in kwargs.items()}
+        inner = get_process_pool().submit(_call_in_process, target, args, kwargs)
+    except BaseException:
+        _unlink(names)
+        raise
+    future = AwaitableFuture()
+
+    def on_done(f):
+        _unlink(names)
+        if f.cancelled():
+            future.cancel()
+            return
+        exception = f.exception()
+        if exception is not None:
+            if not future.cancelled():
+                future.set_exception(exception)
+            return
+        result = f.result()
+        if isinstance(result, _Shared):
+            shared = result
+            try:
+                result = _unshare(shared)
+            finally:
+                _unlink([shared.name])
+        if not future.cancelled():
+            future.set_result(result)
+
+    def on_cancel(f):
+        if f.cancelled():
+            inner.cancel()
+
+    future.add_done_callback(on_cancel)
+    inner.add_done_callback(on_done)
+    return future
+
+
+def process(f: FunctionType):
+    """
+    Decorator that runs the calls of f in the shared process pool (see
+    get_process_pool()), and returns futures of their results, like @thread
+    does with threads. Use it for CPU-bound python code.
+
+    Arguments and results are pickled, except large buffers (see _share())
+    that are copied through shared memory. f must be defined at the top
+    level of a module, so that the workers can import it.
+    """
+    if "<locals>" in f.__qualname__ or f.__name__ == "<lambda>":
+        raise TypeError("@process functions must be defined at the top level of a module.")
+    target = _FunctionRef(f.__module__, f.__qualname__)
+
+    def inner(*args, **kwargs):
+        return _submit_to_process(target, args, kwargs)
+
+    inner = functional.copy_function_data(f, inner)
+    inner.__process_target__ = f
+    return inner
+
+
+class ProcessContainer:
+    """
+    Counterpart of ThreadContainer whose main() runs in the shared process
+    pool: each call of start() runs main() on a copy of the container in a
+    worker process, and returns the future of its result. Changes that
+    main() makes to the container aren't seen by this process.
+
+    Subclasses must be defined at the top level of a module, and their
+    attributes must be picklable.
+    """
+
+    def __init_subclass__(cls, start_immediately=False):
+        """
+        Implement
+
+        class C(cls, start_immediately=False):
+        """
+        cls._immediate_start = start_immediately
+
+    _immediate_start = False
+
+    def __init__(self, args: tuple = None, kwargs: dict = None):
+        """
+        Superclass for classes that run in processes.
+        """
+        self._lock = threading.Lock()
+        self._futures = set()
+
+        if self._immediate_start:
+            if args is None:
+                args = ()
+            if kwargs is None:
+                kwargs = {}
+            self.start(*args, **kwargs)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"], state["_futures"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._futures = set()
+
+    def main(self, *args, **kwargs):
+        """
+        The work of the process.
+        You may override this to customize what the process does.
+        """
+        pass
+
+    def start(self, *args, **kwargs) -> AwaitableFuture:
+        """
+        Run main(*args, **kwargs) in a worker process, and return the
+        future of its result.
+        """
+        future = _submit_to_process(self.main, args, kwargs)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether main() is running or queued.
+        """
+        return bool(self._futures)
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Wait until every call of main() has returned, and return whether
+        they have (False if 'timeout' seconds passed first).
+        """
+        with self._lock:
+            futures = list(self._futures)
+        return not _wait_futures(futures, timeout).not_done
+
+    def stop(self, wait: bool = True, timeout: float = None):
+        """
+        Cancel the calls of main() that haven't started. Running ones can't
+        be interrupted: if wait is True, wait for them (at most 'timeout'
+        seconds).
+        """
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        if wait:
+            self.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+# containers whose threads have to be stopped at exit:
+_containers = weakref.WeakSet()
+
+
+def _at_exit():
+    # like with plain threads, the interpreter waits for the calls that were made,
+    # but loops are told to stop:
+    for container in list(_containers):
+        container.stop(cancel_pending=False)
+    if _pool is not None:
+        _pool.shutdown()
+
+
+# registered so that it runs before the interpreter stops waiting for threads (like concurrent.futures does):
+try:
+    threading._register_atexit(_at_exit)
+except AttributeError:
+    atexit.register(_at_exit)
+
+
 def getAdminRights():
     res = ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, " ".join(sys.argv), None, 1)
     if res >= 32:
@@ -0,0 +1,51 @@
+/* Fixture header for tests/test_headers.py, parsed by multi_tools.c.headers. */
+#ifndef SAMPLE_H
+#define SAMPLE_H
+
+#include <stddef.h>
+
+#define SAMPLE_VERSION 3
+#define SAMPLE_MASK 0xFF
+#define SAMPLE_COUNT (SAMPLE_VERSION * 4)
+#define SAMPLE_MAX(a, b) ((a) > (b) ? (a) : (b))  // macros with parameters are skipped.
+
+typedef unsigned int sample_id;
+
+enum color { RED, GREEN = 5, BLUE };
+
+typedef enum { SMALL = 1, LARGE = SMALL << 4 } size_kind;
+
+typedef struct point {
+    int x, y;
+} point, *point_ptr;
+
+struct flags {
+    unsigned int visible : 1;
+    unsigned int layer : 3;
+    unsigned int rest : 28;
+};
+
+typedef struct {
+    sample_id id;
+    enum color color;
+    point corners[4];
+    char name[SAMPLE_COUNT];
+    double matrix[2][3];
+    struct flags flags;
+} shape;
+
+typedef int (*compare_fn)(const void *, const void *);
+
+union value { int i; double d; };
+
+/* libm */
+double cos(double x);
+double pow(double x, double y);
+
+/* libc */
+int abs(int value);
+size_t strlen(const char *text);
+void qsort(void *base, size_t count, size_t size, compare_fn compare);
+int printf(const char *format, ...);
+
+#endif
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+from multi_tools import system
+from multi_tools.system import runtime
+
+
+def test_wait_is_synchronous_in_event_loops():
+    async def main():
+        start = time.perf_counter()
+        assert system.wait(0.01) is None
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) >= 0.01
+
+
+def test_async_wait_doesnt_block_the_loop():
+    async def main():
+        ticks = []
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0)
+
+        await asyncio.gather(system.async_wait(0.02), ticker())
+        return ticks
+
+    assert len(asyncio.run(main())) == 3
+
+
+def test_await_threaded_function():
+    @system.thread
+    def work(x):
+        return threading.current_thread().name, x * 2
+
+    async def main():
+        return await work(21)
+
+    name, result = asyncio.run(main())
+    assert result == 42
+    assert name != threading.current_thread().name
+
+
+def test_to_thread():
+    async def main():
+        return await asyncio.gather(*(system.to_thread(pow, 2, i) for i in range(8)))
+
+    assert asyncio.run(main()) == [2 ** i for i in range(8)]
+
+
+def test_to_thread_exception():
+    async def main():
+        try:
+            await system.to_thread(divmod, 1, 0)
+        except ZeroDivisionError:
+            return True
+        return False
+
+    assert asyncio.run(main())
+
+
+class Reader(runtime.AsyncThreadContainer):
+    def main(self, value):
+        time.sleep(0.01)
+        return value.upper()
+
+
+class Waiter(runtime.AsyncThreadContainer):
+    def main(self, started):
+        started.set()
+        while not self.stopping:
+            time.sleep(0.001)
+        return "stopped"
+
+
+def test_async_thread_container():
+    async def main():
+        reader = Reader()
+        results = await asyncio.gather(reader.start("a"), reader.start("b"))
+        assert await reader.wait(1)
+        return results, reader.running
+
+    assert asyncio.run(main()) == (["A", "B"], False)
+
+
+def test_async_thread_container_stop():
+    async def main():
+        waiter = Waiter()
+        started = threading.Event()
+        future = waiter.start(started)
+        await asyncio.to_thread(started.wait, 1)
+        waiter.stop(wait=False)
+        return await future
+
+    assert asyncio.run(main()) == "stopped"
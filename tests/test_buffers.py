@@ -0,0 +1,128 @@
+import mmap
+import sys
+
+import pytest
+
+from multi_tools.c import types
+
+
+class Pair(types.CStruct):
+    __fields__ = [("a", types.CInt), ("b", types.CInt)]
+
+
+def test_struct_from_writable_buffer_writes_through():
+    data = bytearray(8)
+    pair = Pair.from_buffer(data)
+    pair.a = 42
+    assert int.from_bytes(data[:4], "little", signed=True) == 42
+
+
+def test_struct_from_readonly_buffer_rejects_writes():
+    data = bytes(8)
+    pair = Pair.from_buffer(data)
+    with pytest.raises(TypeError):
+        pair.a = 42
+    assert data == bytes(8)
+    assert pair.a == 0
+
+
+def test_array_from_readonly_buffer_rejects_writes():
+    data = bytes(16)
+    values = types.CArray[types.CInt].from_buffer(data)
+    assert values.readonly
+    with pytest.raises(TypeError):
+        values[0] = 1
+    with pytest.raises(TypeError):
+        values.fill(1)
+    with pytest.raises(TypeError):
+        values.assign([1, 2])
+    assert data == bytes(16)
+
+
+def test_view_array_of_readonly_buffer_gives_readonly_structs():
+    data = bytes(16)
+    pairs = Pair.view_array(data)
+    assert len(pairs) == 2
+    with pytest.raises(TypeError):
+        pairs[1].b = 3
+    assert data == bytes(16)
+
+
+def _mapped_file(tmp_path, data: bytes):
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def test_slices_keep_the_buffer_exported(tmp_path):
+    mapped = _mapped_file(tmp_path, bytes(range(16)))
+    values = types.CArray[types.CUByte].from_buffer(mapped)
+    part = values[4:8]
+    del values
+    with pytest.raises(BufferError):
+        mapped.close()
+    assert list(part) == [4, 5, 6, 7]
+    assert part.readonly
+    del part
+    mapped.close()
+
+
+def test_array_from_sequence():
+    values = types.CArray[types.CInt]([1, 2, 3])
+    assert not values.readonly
+    assert values.tolist() == [1, 2, 3]
+
+
+@pytest.mark.parametrize("element", [types.CDouble, types.CInt, types.CLong, types.CUByte])
+def test_memoryview_has_native_format(element):
+    values = types.CArray[element]([1, 2, 3])
+    view = values.memoryview()
+    assert view.format[0] not in "@=<>!"
+    assert view.itemsize == values.itemsize
+    assert view.tolist() == [1, 2, 3]
+    assert view[1] == 2
+    view[1] = 5
+    assert values[1] == 5
+
+
+def test_memoryview_of_structs_is_bytes():
+    pairs = types.CArray[Pair](2)
+    view = pairs.memoryview()
+    assert view.format == "B"
+    assert view.nbytes == 16
+
+
+def test_memoryview_of_readonly_array_is_readonly():
+    view = types.CArray[types.CInt].from_buffer(bytes(8)).memoryview()
+    assert view.readonly
+    assert view.tolist() == [0, 0]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="__buffer__ needs python 3.12")
+def test_buffer_protocol():
+    assert memoryview(types.CArray[types.CDouble]([1.5])).tolist() == [1.5]
+
+
+@pytest.mark.parametrize("element, dtype", [(types.CDouble, "float64"), (types.CInt, "int32"),
+                                            (types.CUByte, "uint8"), (types.CLongLong, "int64")])
+def test_numpy_shares_memory(element, dtype):
+    numpy = pytest.importorskip("numpy")
+    values = types.CArray[element]([1, 2, 3])
+    array = numpy.asarray(values)
+    assert array.dtype == numpy.dtype(dtype)
+    array[1] = 7
+    assert values.tolist() == [1, 7, 3]
+
+
+def test_numpy_of_readonly_array_is_readonly():
+    numpy = pytest.importorskip("numpy")
+    array = numpy.asarray(types.CArray[types.CInt].from_buffer(bytes(8)))
+    assert not array.flags.writeable
+
+
+def test_numpy_of_structs_is_bytes():
+    numpy = pytest.importorskip("numpy")
+    array = numpy.asarray(types.CArray[Pair](2))
+    assert array.dtype == numpy.dtype("V8")
+    assert array.shape == (2,)
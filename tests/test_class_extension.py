@@ -0,0 +1,86 @@
+import shutil
+import sys
+
+import pytest
+
+from multi_tools import config
+from multi_tools.cpp import HeaderClass, compiler
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses the C compiler")
+
+SOURCE = r"""
+#include <Python.h>
+
+long Py_add(PyObject *self, long a, long b) { return a + b; }
+long Py_twice(long a) { return 2 * a; }
+double Py_half(double a) { return a / 2; }
+long Py_answer(void) { return 42; }
+PyObject *Py_me(PyObject *self) { Py_INCREF(self); return self; }
+"""
+
+
+@pytest.fixture(scope="module")
+def build_path(tmp_path_factory):
+    if shutil.which(config.Cpp.compiler) is None:
+        pytest.skip("no C compiler")
+    return str(tmp_path_factory.mktemp("build"))
+
+
+@pytest.fixture
+def cached_builds(build_path, monkeypatch):
+    monkeypatch.setattr(config.Cpp, "build_path", build_path)
+
+
+@pytest.fixture
+def compiler_runs(monkeypatch):
+    runs = []
+
+    def run(command, **kwargs):
+        runs.append(command)
+        raise OSError("compiler disabled")
+
+    monkeypatch.setattr(compiler.subprocess, "run", run)
+    return runs
+
+
+@pytest.fixture(scope="module")
+def adder(build_path):
+    previous = config.Cpp.build_path
+    config.Cpp.build_path = build_path
+    try:
+        @HeaderClass(source=SOURCE)
+        class Adder:
+            pass
+    finally:
+        config.Cpp.build_path = previous
+    return Adder
+
+
+def test_pyobject_first_parameter_receives_the_instance(adder):
+    instance = adder()
+    assert instance.add(1, 2) == 3
+    assert instance.me() is instance
+
+
+def test_other_functions_are_static(adder):
+    assert isinstance(vars(adder)["twice"], staticmethod)
+    assert adder.twice(21) == 42
+    assert adder().twice(21) == 42
+    assert adder.half(3.0) == 1.5
+    assert adder.answer() == 42
+
+
+def test_compiled_sources_are_reused(adder, cached_builds, compiler_runs):
+    @HeaderClass(source=SOURCE)
+    class Again:
+        pass
+
+    assert Again.twice(2) == 4
+    assert not compiler_runs
+
+
+def test_other_pythons_dont_reuse_libraries(adder, cached_builds, compiler_runs, monkeypatch):
+    monkeypatch.setattr(sys.implementation, "cache_tag", "other-python")
+    with pytest.raises(compiler.CompileError):
+        compiler.compile_source(SOURCE)
+    assert len(compiler_runs) == 1
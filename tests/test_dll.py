@@ -0,0 +1,30 @@
+import ctypes
+import sys
+
+import pytest
+
+from multi_tools.system import DLL, DllImport
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses libm")
+
+
+def test_handles_share_the_library():
+    first, second = DLL("m"), DLL("m")
+    assert first.safe_getattr("_lib")._handle == second.safe_getattr("_lib")._handle
+
+
+def test_handles_have_their_own_functions():
+    first, second = DLL("m"), DLL("m")
+    first.cos.restype = ctypes.c_double
+    first.cos.argtypes = [ctypes.c_double]
+    assert first.cos(0.0) == 1.0
+    assert second.cos.restype is ctypes.c_int
+    assert second.cos.argtypes is None
+
+
+def test_dll_import():
+    @DllImport("m")
+    def cos(x: float) -> float: ...
+
+    assert cos(0.0) == 1.0
+    assert DLL("m").cos.restype is ctypes.c_int
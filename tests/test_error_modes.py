@@ -0,0 +1,152 @@
+import ctypes.util
+import errno
+import shutil
+import sys
+
+import pytest
+
+from multi_tools import common, config
+from multi_tools.cpp import compiler
+from multi_tools.system import DllImport
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses libc and the C compiler")
+
+LIBC = ctypes.util.find_library("c")
+
+SOURCE = r"""
+#include <stdio.h>
+#include <errno.h>
+
+const char *fails(void) { return "$*1:ValueError:bad value"; }
+
+const char *leaves_errno(void) {
+    FILE *f = fopen("/nonexistent/file", "r");  /* sets errno, but the function succeeds */
+    if (f) fclose(f);
+    return "hello";
+}
+
+int fails_with_errno(void) { errno = EACCES; return -1; }
+"""
+
+
+@pytest.fixture(scope="module")
+def library(tmp_path_factory):
+    if shutil.which(config.Cpp.compiler) is None:
+        pytest.skip("no C compiler")
+    return compiler.compile_source(SOURCE, build_path=str(tmp_path_factory.mktemp("build")))
+
+
+def test_default_mode_is_string():
+    assert common.Dll.error_mode == common.ErrorModes.STRING
+
+
+def test_default_mode_raises_failure_strings(library):
+    @DllImport(library)
+    def fails() -> str: ...
+
+    with pytest.raises(ValueError, match="bad value"):
+        fails()
+
+
+def test_default_mode_ignores_errno(library):
+    @DllImport(library)
+    def leaves_errno() -> str: ...
+
+    assert leaves_errno() == "hello"
+
+
+def test_errno_mode_ignores_errno_of_successful_calls(library, tmp_path):
+    @DllImport(library, error_mode=common.ErrorModes.ERRNO)
+    def leaves_errno() -> str: ...
+
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def isatty(fd: int) -> int: ...
+
+    assert leaves_errno() == "hello"
+    with open(tmp_path / "file", "w") as f:
+        assert isatty(f.fileno()) == 0  # sets errno to ENOTTY.
+
+
+def test_errno_mode_raises_on_failure(library):
+    @DllImport(library, error_mode=common.ErrorModes.ERRNO)
+    def fails_with_errno() -> int: ...
+
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def fopen(path: str, mode: str) -> str: ...
+
+    with pytest.raises(PermissionError):
+        fails_with_errno()
+    with pytest.raises(FileNotFoundError) as info:
+        fopen("/nonexistent/file", "r")  # returns NULL.
+    assert info.value.errno == errno.ENOENT
+
+
+def test_errno_mode_with_libc_int_functions():
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def close(fd: int) -> int: ...
+
+    with pytest.raises(OSError) as info:
+        close(-1)
+    assert info.value.errno == errno.EBADF
+
+
+def test_int_annotations_are_c_ints():
+    @DllImport(LIBC)
+    def abs(value: int) -> int: ...
+
+    assert abs(-5) == 5
+    assert abs(-1 << 31) == -1 << 31  # INT_MIN has no positive int.
+
+
+def test_errno_mode_ignores_errno_of_void_functions():
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def srand(seed: int) -> None: ...
+
+    ctypes.set_errno(errno.EIO)
+    try:
+        assert srand(1) is None
+    finally:
+        ctypes.set_errno(0)
+
+
+def test_errno_mode_failure_values_depend_on_the_return_type():
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def atoi(text: str) -> int: ...
+
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def atof(text: str) -> float: ...
+
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def strtoul(text: str, end: ctypes.c_void_p, base: int) -> ctypes.c_ulong: ...
+
+    @DllImport(LIBC, error_mode=common.ErrorModes.ERRNO)
+    def getenv(name: str) -> str: ...
+
+    try:
+        ctypes.set_errno(0)
+        assert atoi("-1") == -1
+        ctypes.set_errno(errno.EIO)
+        assert atof("-1") == -1.0  # doubles are never checked.
+        assert strtoul("-1", None, 10) == ctypes.c_ulong(-1).value  # nor unsigned integers.
+        with pytest.raises(OSError):
+            atoi("-1")  # -1 from a signed integer function.
+        ctypes.set_errno(errno.EIO)
+        with pytest.raises(OSError):
+            getenv("MULTI_TOOLS_NO_SUCH_VARIABLE")  # NULL from a string function.
+    finally:
+        ctypes.set_errno(0)
+
+
+def test_registered_error_codes(library):
+    @DllImport(library, error_mode=common.ErrorModes.ERRNO)
+    def fails_with_errno() -> int: ...
+
+    class AccessDenied(Exception):
+        pass
+
+    common.CallResults.register_error(errno.EACCES, AccessDenied)
+    try:
+        with pytest.raises(AccessDenied):
+            fails_with_errno()
+    finally:
+        del common.CallResults.errors[errno.EACCES]
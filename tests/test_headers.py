@@ -0,0 +1,103 @@
+import ctypes
+import os
+import sys
+
+import pytest
+
+from multi_tools.c import headers, types
+
+HEADER = os.path.join(os.path.dirname(__file__), "headers", "sample.h")
+
+
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("bindings"))
+
+
+@pytest.fixture(scope="module")
+def sample(cache_dir):
+    return headers.load_header(HEADER, cache_dir)
+
+
+def test_defines(sample):
+    assert sample.SAMPLE_VERSION == 3
+    assert sample.SAMPLE_MASK == 0xFF
+    assert sample.SAMPLE_COUNT == 12
+    assert not hasattr(sample, "SAMPLE_MAX")
+
+
+def test_enums(sample):
+    assert (sample.RED, sample.GREEN, sample.BLUE) == (0, 5, 6)
+    assert (sample.SMALL, sample.LARGE) == (1, 16)
+    assert sample.color is types.CInt
+    assert sample.size_kind is types.CInt
+
+
+def test_typedefs(sample):
+    assert sample.sample_id is types.CUInt
+    assert sample.point_ptr is ctypes.POINTER(types.ctype_of(sample.point))
+
+
+def test_struct_with_arrays(sample):
+    shape = sample.shape()
+    layout = types.ctype_of(sample.shape)
+    assert (layout.corners.offset, layout.name.offset, layout.matrix.size) == (8, 40, 48)
+    corners = shape.corners
+    corners[2].x = 7
+    assert shape.corners[2].x == 7
+    shape.name = b"square"  # char arrays are strings.
+    assert shape.name == b"square"
+    assert len(shape.matrix) == 2 and len(shape.matrix[0]) == 3
+
+
+def test_bit_fields(sample):
+    flags = sample.flags()
+    assert ctypes.sizeof(types.ctype_of(sample.flags)) == 4
+    flags.visible = 1
+    flags.layer = 5
+    flags.rest = 1 << 27
+    assert (flags.visible, flags.layer, flags.rest) == (1, 5, 1 << 27)
+    flags.layer = 9  # 3 bits
+    assert flags.layer == 1
+
+
+def test_skipped_declarations(sample):
+    assert any("union value" in skipped for skipped in sample.__skipped__)
+
+
+def test_cached_bindings_are_reused(sample, cache_dir, monkeypatch):
+    assert headers.load_header(HEADER, cache_dir) is sample
+    files = sorted(os.listdir(cache_dir))
+    assert len(files) == 1
+
+    # a new process only loads the cached module, without parsing the header:
+    monkeypatch.setattr(headers, "_loaded", {})
+    monkeypatch.setattr(headers, "generate_bindings", None)
+    again = headers.load_header(HEADER, cache_dir)
+    assert again is not sample
+    assert again.SAMPLE_COUNT == 12
+    assert sorted(os.listdir(cache_dir)) == files
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses libm and libc")
+def test_bind_libm(sample):
+    libm = sample.bind("m")
+    assert libm.cos(0.0) == 1.0
+    assert libm.pow(2.0, 10.0) == 1024.0
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses libm and libc")
+def test_bind_libc_with_callback(sample):
+    libc = sample.bind("c")
+    assert libc.abs(-5) == 5
+    assert libc.strlen(b"hello") == 5
+
+    values = types.CArray[types.CInt]([5, 3, 9, 1])
+    item = ctypes.POINTER(ctypes.c_int)
+
+    def compare(a, b):
+        return ctypes.cast(a, item)[0] - ctypes.cast(b, item)[0]
+
+    compare = sample.compare_fn(compare)
+    libc.qsort(values, len(values), values.itemsize, compare)
+    assert values.tolist() == [1, 3, 5, 9]
@@ -0,0 +1,85 @@
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from multi_tools.system import env
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / "lazy_pkg"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "child.py").write_text(textwrap.dedent("""
+        import builtins
+        builtins.lazy_pkg_runs = getattr(builtins, "lazy_pkg_runs", 0) + 1
+        value = 42
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_pkg"
+    for name in ("lazy_pkg", "lazy_pkg.child"):
+        sys.modules.pop(name, None)
+        env._specs.pop(name, None)
+    import builtins
+    if hasattr(builtins, "lazy_pkg_runs"):
+        del builtins.lazy_pkg_runs
+
+
+def test_module_runs_on_first_access(package):
+    import builtins
+    module = env.import_module("lazy_pkg.child")
+    assert sys.modules["lazy_pkg.child"] is module
+    assert not hasattr(builtins, "lazy_pkg_runs")
+    assert module.value == 42
+    assert builtins.lazy_pkg_runs == 1
+    assert env.import_module("lazy_pkg.child") is module
+    assert module.value == 42
+    assert builtins.lazy_pkg_runs == 1
+
+
+def test_module_is_set_on_its_parent(package):
+    module = env.import_module("lazy_pkg.child")
+    assert sys.modules["lazy_pkg"].child is module
+    from lazy_pkg import child
+    assert child is module
+
+
+def test_missing_module():
+    with pytest.raises(ModuleNotFoundError):
+        env.import_module("multi_tools_no_such_module")
+
+
+def test_module_handle_shares_the_module(package):
+    handle = env.Module("lazy_pkg.child")
+    assert handle.value == 42
+    assert handle.safe_getattr("_module") is sys.modules["lazy_pkg.child"]
+
+
+@pytest.fixture
+def plugins(tmp_path, monkeypatch):
+    root = tmp_path / "lazy_plug"
+    root.mkdir()
+    (root / "__init__.py").write_text(textwrap.dedent("""
+        from multi_tools.system import env
+        opt = env.import_module("lazy_plug.opt")
+    """))
+    (root / "opt.py").write_text("value = 'opt'\n")
+    (root / "other.py").write_text("value = 'other'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_plug"
+    for name in ("lazy_plug", "lazy_plug.opt", "lazy_plug.other"):
+        sys.modules.pop(name, None)
+        env._specs.pop(name, None)
+
+
+def test_package_that_imports_its_modules_lazily(plugins):
+    # the package runs while import_module() imports it as the parent of "lazy_plug.other":
+    result = []
+    thread = threading.Thread(target=lambda: result.append(env.import_module("lazy_plug.other")), daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "import_module() deadlocked"
+    assert result[0].value == "other"
+    assert sys.modules["lazy_plug"].opt.value == "opt"
@@ -0,0 +1,54 @@
+import ctypes
+import ctypes.util
+import sys
+import threading
+
+import pytest
+
+from multi_tools import common
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses libm")
+
+
+@pytest.fixture(scope="module")
+def c_pow():
+    function = ctypes.CDLL(ctypes.util.find_library("m")).pow
+    function.argtypes = [ctypes.c_double, ctypes.c_double]
+    function.restype = ctypes.c_double
+    return function
+
+
+def test_results_are_in_order(c_pow):
+    batches = [(2, i) for i in range(100)]
+    assert common.parallel_call(c_pow, batches, workers=4) == [2.0 ** i for i in range(100)]
+
+
+def test_rejects_python_functions():
+    with pytest.raises(TypeError):
+        common.parallel_call(len, [(1,)])
+
+
+def test_single_worker(c_pow):
+    assert common.parallel_call(c_pow, [[3, 2]], workers=1) == [9.0]
+
+
+def test_concurrent_callers_with_different_worker_counts(c_pow):
+    errors = []
+    results = {}
+    barrier = threading.Barrier(38)
+
+    def caller(index):
+        barrier.wait()
+        try:
+            results[index] = common.parallel_call(c_pow, [(2, i) for i in range(50)], workers=index % 12 + 2)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(38)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert all(result == [2.0 ** i for i in range(50)] for result in results.values())
+    assert len(results) == 38
@@ -0,0 +1,147 @@
+import array
+import asyncio
+import sys
+from multiprocessing import shared_memory
+
+import pytest
+
+from multi_tools import config
+from multi_tools.c import types
+from multi_tools.system import runtime
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="worker processes import this module by name")
+
+LARGE = 2 * config.Runtime.shared_memory_threshold
+
+
+@runtime.process
+def square(x):
+    return x * x
+
+
+@runtime.process
+def fail():
+    raise ValueError("from a worker")
+
+
+@runtime.process
+def reverse(data):
+    return data[::-1]
+
+
+@runtime.process
+def total(values):
+    return sum(values)
+
+
+@runtime.process
+def double(values):
+    values[0] *= 2
+    return values
+
+
+class Summer(runtime.ProcessContainer):
+    def __init__(self, start):
+        self.start_value = start
+        super().__init__()
+
+    def main(self, *values):
+        self.start_value += sum(values)  # changes a copy of the container.
+        return self.start_value
+
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pool():
+    pool = runtime.configure_process_pool(2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def unlinked(monkeypatch):
+    names = []
+    unlink = runtime._unlink
+
+    def record(blocks):
+        names.extend(blocks)
+        unlink(blocks)
+
+    monkeypatch.setattr(runtime, "_unlink", record)
+    return names
+
+
+def test_results_and_exceptions():
+    assert [future.result() for future in [square(i) for i in range(8)]] == [i * i for i in range(8)]
+    with pytest.raises(ValueError, match="from a worker"):
+        fail().result()
+
+
+def test_futures_can_be_awaited():
+    async def main():
+        return await asyncio.gather(square(3), square(4))
+
+    assert asyncio.run(main()) == [9, 16]
+
+
+def test_functions_must_be_importable():
+    with pytest.raises(TypeError):
+        @runtime.process
+        def local(x):
+            return x
+
+
+@pytest.mark.parametrize("value", [bytes(range(256)) * (LARGE // 256), bytearray(b"ab" * LARGE)])
+def test_large_bytes_round_trip(value, unlinked):
+    result = reverse(value).result()
+    assert type(result) is type(value)
+    assert result == value[::-1]
+    assert len(unlinked) == 2  # the argument's block and the result's block.
+
+
+def test_large_array_round_trip(unlinked):
+    values = array.array("d", range(LARGE // 8))
+    result = double(values).result()
+    assert result.typecode == "d"
+    assert result[0] == 0 and result[1:] == values[1:]
+    assert len(unlinked) == 2
+
+
+def test_large_carray_round_trip(unlinked):
+    values = types.CArray[types.CInt](list(range(LARGE // 4)))
+    values[0] = 21
+    result = double(values).result()
+    assert isinstance(result, types.CArray[types.CInt])
+    assert result[0] == 42 and result[1:].tolist() == values[1:].tolist()
+    assert values[0] == 21  # the worker changed a copy.
+    assert total(values).result() == sum(values.tolist())
+
+
+def test_shared_blocks_are_unlinked(unlinked):
+    assert total(array.array("i", [1]) * (LARGE // 4)).result() == LARGE // 4
+    reverse(b"x" * LARGE).result()
+    assert len(unlinked) == 3
+    for name in unlinked:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name)
+
+
+def test_small_values_are_pickled(unlinked):
+    assert reverse(b"abc").result() == b"cba"
+    assert not unlinked
+
+
+def test_process_container():
+    container = Summer(10)
+    futures = [container.start(1, 2), container.start(3)]
+    assert [future.result() for future in futures] == [13, 13]
+    assert container.start_value == 10
+    assert container.join(5)
+    assert not container.running
+
+
+def test_process_container_stop():
+    container = Summer(0)
+    futures = [container.start(i) for i in range(20)]
+    container.stop(timeout=10)
+    assert not container.running
+    assert all(future.done() for future in futures)
@@ -0,0 +1,60 @@
+import struct
+
+import pytest
+
+from multi_tools.c import types
+from multi_tools.c.records import RecordFile
+
+
+class Sample(types.CStruct):
+    __fields__ = [("time", types.CInt), ("value", types.CDouble)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "samples.bin"
+    path.write_bytes(b"".join(struct.pack("@id", i, i / 2) for i in range(10)))
+    return path
+
+
+def test_records(path):
+    with RecordFile(Sample, path) as records:
+        assert len(records) == 10
+        assert records[3].time == 3
+        assert records.column("time").tolist() == list(range(10))
+        assert [len(chunk) for chunk in records.chunks(4)] == [4, 4, 2]
+
+
+def test_close_without_views(path):
+    records = RecordFile(Sample, path)
+    list(records.chunks(4))
+    records.close()
+    records.close()
+
+
+@pytest.mark.parametrize("make_view", [
+    lambda records: next(records.chunks(4)),
+    lambda records: records[2],
+    lambda records: records[1:3],
+    lambda records: records.records,
+])
+def test_close_with_live_views_raises(path, make_view):
+    records = RecordFile(Sample, path)
+    view = make_view(records)
+    with pytest.raises(BufferError):
+        records.close()
+    # the file is still usable, and so is the view:
+    assert records[5].time == 5
+    assert view is not None and repr(view)
+    del view
+    records.close()
+
+
+def test_chunks_outlive_iteration(path):
+    records = RecordFile(Sample, path)
+    chunks = list(records.chunks(3))
+    with pytest.raises(BufferError):
+        records.close()
+    assert [sample.time for chunk in chunks for sample in chunk] == list(range(10))
+    del chunks
+    records.close()
@@ -0,0 +1,181 @@
+import queue
+import threading
+
+import pytest
+
+from multi_tools import config
+from multi_tools.system import runtime
+
+
+@pytest.fixture
+def submit_timeout():
+    def set_timeout(value):
+        config.Runtime.submit_timeout = value
+
+    previous = config.Runtime.submit_timeout
+    yield set_timeout
+    config.Runtime.submit_timeout = previous
+
+
+def test_results_and_exceptions():
+    with runtime.WorkerPool(2, 4) as pool:
+        assert pool.submit(pow, 2, 10).result() == 1024
+        with pytest.raises(ZeroDivisionError):
+            pool.submit(divmod, 1, 0).result()
+    stats = pool.stats()
+    assert stats.submitted == stats.completed == 2
+
+
+def test_workers_are_bounded():
+    release = threading.Event()
+    with runtime.WorkerPool(2, 16) as pool:
+        futures = [pool.submit(release.wait) for _ in range(8)]
+        assert pool.stats().workers <= 2
+        release.set()
+        assert all(future.result() for future in futures)
+
+
+def test_full_queue_blocks_then_raises(submit_timeout):
+    release = threading.Event()
+    submit_timeout(0.05)
+    pool = runtime.WorkerPool(1, 1)
+    running = pool.submit(release.wait)
+    pool.submit(release.wait)  # waits in the queue once the first call runs.
+    with pytest.raises(queue.Full):
+        for _ in range(2):
+            pool.submit(release.wait)
+    release.set()
+    assert running.result()
+    pool.shutdown()
+    assert pool.stats().submitted == pool.stats().completed
+
+
+def test_calls_from_workers_run_when_the_queue_is_full():
+    with runtime.WorkerPool(1, 1) as pool:
+        def outer():
+            return [pool.submit(pow, 2, i) for i in range(4)]
+
+        futures = pool.submit(outer).result()
+        assert [future.result() for future in futures] == [1, 2, 4, 8]
+
+
+def test_submit_after_shutdown():
+    pool = runtime.WorkerPool(1, 1)
+    pool.shutdown()
+    with pytest.raises(RuntimeError):
+        pool.submit(pow, 2, 2)
+
+
+def test_shutdown_fails_waiting_submits():
+    release = threading.Event()
+    pool = runtime.WorkerPool(1, 1)
+    pool.submit(release.wait)
+    pool.submit(release.wait)
+    errors = []
+    waiting = threading.Thread(target=lambda: errors.append(pytest.raises(RuntimeError, pool.submit, pow, 2, 2)))
+    waiting.start()
+    waiting.join(0.1)
+    # shutdown() waits for room for the sentinel of the worker, but the waiting submit fails first:
+    stopper = threading.Thread(target=pool.shutdown)
+    stopper.start()
+    waiting.join(1)
+    assert errors
+    release.set()
+    stopper.join()
+
+
+def test_submits_during_shutdown_complete_or_raise():
+    # every call that was accepted must complete, even if shutdown() comes in between:
+    for _ in range(20):
+        pool = runtime.WorkerPool(4, 8)
+        futures = []
+        rejected = []
+        barrier = threading.Barrier(5)
+
+        def submitter():
+            barrier.wait()
+            for i in range(50):
+                try:
+                    futures.append(pool.submit(pow, 2, i))
+                except RuntimeError:
+                    rejected.append(i)
+                    return
+
+        threads = [threading.Thread(target=submitter) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        pool.shutdown()
+        for thread in threads:
+            thread.join()
+        assert all(future.result(timeout=5) is not None for future in futures)
+
+
+def test_configure_pool_while_submitting():
+    previous = runtime.get_pool()
+
+    @runtime.thread
+    def square(x):
+        return x * x
+
+    futures = []
+    errors = []
+
+    def submitter():
+        try:
+            for i in range(200):
+                futures.append(square(i))
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=submitter) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(5):
+        runtime.configure_pool(4, 16)
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert sorted(future.result(timeout=5) for future in futures) == sorted(i * i for i in range(200) for _ in range(4))
+    previous.shutdown()
+
+
+class Counter(runtime.ThreadContainer):
+    def main(self, value):
+        return value + 1
+
+
+class Looper(runtime.ThreadContainer):
+    def main(self, started):
+        started.set()
+        while not self.stopping:
+            threading.Event().wait(0.001)
+        return "stopped"
+
+
+def test_thread_container_runs_calls_in_order():
+    container = Counter()
+    futures = [container.start(i) for i in range(10)]
+    assert [future.result() for future in futures] == list(range(1, 11))
+    assert container.join(1)
+    assert not container.running
+    container.stop()
+
+
+def test_thread_container_stop():
+    container = Looper()
+    started = threading.Event()
+    running = container.start(started)
+    queued = container.start(threading.Event())
+    assert started.wait(1)
+    container.stop(timeout=1)
+    assert running.result(timeout=1) == "stopped"
+    assert queued.cancelled()
+    assert not container.running
+
+
+def test_thread_container_pooled():
+    with Counter.pooled() as container:
+        assert container.start(1).result() == 2
+    assert Counter.pooled() is container
+    container.stop()